@@ -0,0 +1,31 @@
+"""resource_stocks: rely on (player_id, resource) unique index
+
+Revision ID: c3f1a9d24e07
+Revises: 7acddb502ba4
+Create Date: 2026-10-17 09:12:41.208314
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f1a9d24e07'
+down_revision: Union[str, Sequence[str], None] = '7acddb502ba4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # uix_player_resource (player_id, resource) already serves every
+    # lookup by player_id (leftmost prefix) and by (player_id, resource):
+    # the single-column index only costs an extra B-tree write per insert.
+    op.drop_index(op.f('ix_resource_stocks_player_id'), table_name='resource_stocks')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_resource_stocks_player_id'), 'resource_stocks', ['player_id'], unique=False)
@@ -0,0 +1,33 @@
+"""schema_meta: key/value markers (resources.yml seed hash)
+
+Revision ID: d5e8b2c61f40
+Revises: c3f1a9d24e07
+Create Date: 2026-10-17 14:03:27.519842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e8b2c61f40'
+down_revision: Union[str, Sequence[str], None] = 'c3f1a9d24e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'schema_meta',
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('value', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('key'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('schema_meta')
@@ -0,0 +1,56 @@
+"""player_cards / player_items: composite (player_id, key) indexes
+
+Revision ID: e2a7c4f91b35
+Revises: d5e8b2c61f40
+Create Date: 2026-10-17 15:21:08.734102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c4f91b35'
+down_revision: Union[str, Sequence[str], None] = 'd5e8b2c61f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Both tables come from create_all() (no earlier revision creates them):
+    # on a fresh `alembic upgrade head` they may not exist yet, so skip them
+    # (create_all() then builds them with these indexes from the models).
+    # if_(not_)exists covers tables created by create_all() before this ran.
+    if _has_table('player_cards'):
+        op.create_index(
+            'ix_player_cards_player_card', 'player_cards', ['player_id', 'card_key'],
+            unique=False, if_not_exists=True,
+        )
+        # (player_id, card_key) covers player_id-only lookups (leftmost prefix)
+        op.drop_index('ix_player_cards_player_id', table_name='player_cards', if_exists=True)
+
+    if _has_table('player_items'):
+        op.create_index(
+            'ix_player_items_player_item', 'player_items', ['player_id', 'item_key'],
+            unique=False, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _has_table('player_items'):
+        op.drop_index('ix_player_items_player_item', table_name='player_items', if_exists=True)
+
+    if _has_table('player_cards'):
+        op.create_index(
+            'ix_player_cards_player_id', 'player_cards', ['player_id'],
+            unique=False, if_not_exists=True,
+        )
+        op.drop_index('ix_player_cards_player_card', table_name='player_cards', if_exists=True)
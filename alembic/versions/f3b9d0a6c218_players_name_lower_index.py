@@ -0,0 +1,31 @@
+"""players: expression index on lower(name) for the admin search
+
+Revision ID: f3b9d0a6c218
+Revises: e2a7c4f91b35
+Create Date: 2026-10-17 16:02:41.518307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9d0a6c218'
+down_revision: Union[str, Sequence[str], None] = 'e2a7c4f91b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_players_name_lower', 'players', [sa.text('lower(name)')],
+        unique=False, if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_players_name_lower', table_name='players', if_exists=True)
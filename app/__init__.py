@@ -1,6 +1,13 @@
 # app/__init__.py
+import os
+import secrets
+
+import orjson
 from flask import Flask, jsonify, render_template
-from .db import init_db
+from .db import init_db, db_session
+from .json_provider import ORJSONProvider
+from .compression import init_compression
+from .http_cache import cached_body, content_etag
 from .seed import reseed_resources, ensure_resources_seeded
 from .seed_cards import seed_cards_from_yaml
 from .routes import register_routes
@@ -13,19 +20,29 @@ from app.admin import admin_bp
 
 def create_app() -> Flask:
     app = Flask(__name__)
+    app.json = ORJSONProvider(app)
     
     # ===== Admin Panel activé en dev =====
     app.config["ADMIN_ENABLED"] = True
     # =====================================    
 
+    # Signe le cookie de session Flask (claim admin, cf. app/admin).
+    # Sans SECRET_KEY, clé aléatoire par process : le claim n'est alors
+    # valide que dans le worker qui l'a posé (les autres revérifient en DB).
+    app.config["SECRET_KEY"] = os.getenv("SECRET_KEY") or secrets.token_hex(32)
+
     init_db()
     seed_cards_from_yaml()
     ensure_resources_seeded()
-    reseed_resources()
     load_craft_defs()
     load_quest_templates()
     register_routes(app)
+    init_compression(app)
 
+    @app.teardown_appcontext
+    def _remove_db_session(exc=None):
+        # Close the request-scoped session (rollback if not committed)
+        db_session.remove()
     
     app.register_blueprint(frontend_bp)
     
@@ -42,19 +59,25 @@ def create_app() -> Flask:
         # UI dev
         return render_template("DEV_UI/index.html")
 
+    # LEVELS est statique pour la durée du process : body JSON sérialisé une fois
+    levels_body = orjson.dumps({
+        "thresholds": [
+            {"level": lvl, "xp_required": cfg["xp_required"]}
+            for lvl, cfg in sorted(LEVELS.items())
+        ]
+    })
+    levels_etag = content_etag(levels_body)
+
     @app.get("/api/levels")
     def list_levels():
-        data = [
-            {"level": i, "xp_required": xp}
-            for i, xp in enumerate(LEVELS)
-        ]
-        return jsonify({"thresholds": data})
+        return cached_body(levels_etag, levels_body)
 
     @app.post("/api/dev/reseed")
     def dev_reseed():
         try:
-            n = reseed_resources()
-            return jsonify({"ok": True, "inserted": n})
+            # inserted = defs synchronisées (comme avant), changed = lignes modifiées
+            synced, changed = reseed_resources()
+            return jsonify({"ok": True, "inserted": synced, "changed": changed})
         except Exception as e:
             return jsonify({"ok": False, "error": str(e)}), 500
 
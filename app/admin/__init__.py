@@ -1,23 +1,46 @@
 # app/admin/__init__.py
-from functools import wraps
+from dataclasses import dataclass
 import re
+import textwrap
+import time
 
+import orjson
 from flask import (
-    Blueprint, current_app, redirect, 
-    url_for, abort, render_template, request)
-from app.db import SessionLocal
-from app.auth import get_current_player
+    Blueprint, Response, current_app, redirect,
+    url_for, abort, render_template, request, stream_with_context)
+from sqlalchemy import func, literal, select
+from sqlalchemy.orm import load_only
+
+from app.db import db_session
+from app.http_cache import cached_html, content_etag
+from app.resource_defs import load_resource_defs
 from app.models import (
     Player,
     PlayerCard,
     CardDef,
     ResourceStock,
-    ResourceDef,
 )
 
-from pathlib import Path
 import yaml
 
+from .auth import admin_required
+from .yaml_store import (  # _YamlLoader / _YamlDumper : libyaml si dispo
+    _YamlDumper,
+    _YamlLoader,
+    CARDS_YAML_PATH,
+    LANDS_YAML_PATH,
+    RESOURCES_YAML_PATH,
+    load_cards_yaml,
+    load_lands_yaml,
+    load_levels_yaml,
+    load_resources_yaml,
+    save_cards_yaml,
+    save_lands_yaml,
+    save_levels_yaml,
+    save_resources_yaml,
+    yaml_list_view,
+)
+
 # Blueprint for the admin panel
 admin_bp = Blueprint(
     "admin",
@@ -27,492 +50,361 @@ admin_bp = Blueprint(
     static_folder="static",      # static inside app/admin/static
 )
 
-# ============================
-# Levels YAML helpers
-# ============================
-
-def _levels_yaml_path() -> Path:
-    """Return the absolute path to app/data/levels.yml."""
-    # current_app.root_path = dossier "app/"
-    return Path(current_app.root_path) / "data" / "levels.yml"
-
 
-def load_levels_yaml() -> list[dict]:
-    """
-    Load levels from app/data/levels.yml.
-
-    Expected format:
-    levels:
-      - level: 1
-        xp_required: 10
-        rewards:
-          - type: coins
-            amount: 20
-      - level: 2
-        xp_required: 30
-        rewards: [...]
-    """
-    path = _levels_yaml_path()
-    if not path.exists():
-        return []
+# Lignes de cards_list / resources_list (cf. yaml_store.yaml_list_view)
+@dataclass(frozen=True, slots=True)
+class CardView:
+    key: str
+    label: str
+    type: str
+    rarity: str
+    enabled: bool
+
+
+@dataclass(frozen=True, slots=True)
+class ResourceView:
+    key: str
+    label: str
+    icon: str
+    unlock_min_level: int
+    base_cooldown: float
+    base_sell_price: int
+    enabled: bool
+
+
+def _card_view(key: str, cfg) -> CardView:
+    if not isinstance(cfg, dict):
+        cfg = {}
+    return CardView(
+        key=key,
+        label=cfg.get("label_fr") or cfg.get("label_en") or cfg.get("label") or key,
+        type=cfg.get("type", "?"),
+        rarity=cfg.get("rarity", "-"),
+        enabled=bool(cfg.get("enabled", True)),
+    )
 
-    with path.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
 
-    levels = data.get("levels")
-    if isinstance(levels, list):
-        # We keep as-is but we might sort when saving.
-        return levels
-    return []
+def _resource_view(key: str, cfg) -> ResourceView:
+    if not isinstance(cfg, dict):
+        cfg = {}
+    return ResourceView(
+        key=key,
+        label=(cfg.get("label") or key).strip(),
+        icon=(cfg.get("icon") or "").strip(),
+        unlock_min_level=cfg.get("unlock_min_level", 0),
+        base_cooldown=cfg.get("base_cooldown", 0.0),
+        base_sell_price=cfg.get("base_sell_price", 0),
+        enabled=bool(cfg.get("enabled", True)),
+    )
 
 
-def save_levels_yaml(levels: list[dict]) -> None:
+def _parse_yaml_blocks(blocks: dict[str, str]) -> tuple[dict, list[str]]:
     """
-    Save levels list back to app/data/levels.yml.
+    Parse plusieurs textareas YAML {champ: texte} en un seul document :
+    chaque bloc non vide est indenté sous sa clé. Bloc vide -> None
+    (le champ sera supprimé).
 
-    We:
-    - Wrap in a top-level "levels:" key
-    - Sort by level ascending
-    - Keep keys order (no sort_keys)
+    Si le document combiné est invalide, on reparse bloc par bloc pour
+    rattacher l'erreur au bon champ (chemin rare).
+    Retourne (valeurs, erreurs).
     """
-    # Ensure sorted by "level"
-    def _lvl_num(l: dict) -> int:
-        try:
-            return int(l.get("level") or 0)
-        except Exception:
-            return 0
-
-    levels_sorted = sorted(levels, key=_lvl_num)
-
-    payload = {
-        "levels": levels_sorted,
-    }
-
-    path = _levels_yaml_path()
-    path.parent.mkdir(parents=True, exist_ok=True)
-
-    with path.open("w", encoding="utf-8") as f:
-        yaml.safe_dump(
-            payload,
-            f,
-            sort_keys=False,
-            allow_unicode=True,
-            default_flow_style=False,
-            indent=2,
-        )
+    values = dict.fromkeys(blocks)
+    filled = {name: text for name, text in blocks.items() if text}
+    if not filled:
+        return values, []
 
+    combined = "\n".join(
+        f"{name}:\n{textwrap.indent(text, '  ')}" for name, text in filled.items()
+    )
+    try:
+        parsed = yaml.load(combined, Loader=_YamlLoader)
+    except yaml.YAMLError:
+        parsed = None
+    if isinstance(parsed, dict) and parsed.keys() == filled.keys():
+        values.update(parsed)
+        return values, []
 
-# -------------------------------------------------------------------
-# Lands YAML helpers
-# -------------------------------------------------------------------
+    errors: list[str] = []
+    for name, text in filled.items():
+        try:
+            values[name] = yaml.load(text, Loader=_YamlLoader)
+        except yaml.YAMLError as exc:
+            errors.append(f"YAML invalide dans '{name}': {exc}")
+    return values, errors
 
-LANDS_YAML_PATH = Path(__file__).resolve().parents[1] / "data" / "lands.yml"
 
+# Snapshot des CardDef en DB : diff YAML <-> DB de cards_list et libellés
+# des cartes de player_detail (sans JOIN).
+# card_defs n'est écrit que par seed_cards_from_yaml (démarrage d'un worker) :
+# un TTL court suffit, pas d'ORM en cache (juste des snapshots).
+@dataclass(frozen=True, slots=True)
+class CardDefInfo:
+    id: int
+    key: str
+    label: str | None
+    type: str | None
+    rarity: str | None
 
-def load_lands_yaml() -> dict:
-    """Load lands.yml and return a mapping {slug: config_dict}."""
-    if not LANDS_YAML_PATH.exists():
-        return {}
 
-    with LANDS_YAML_PATH.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+_CARD_DEFS_TTL = 30.0
+_card_defs_cache: tuple[float, dict[str, CardDefInfo], frozenset[str]] | None = None
 
-    # Ton format actuel est déjà { "forest": {...}, "beach": {...}, ... }
-    if isinstance(data, dict):
-        return data
 
-    return {}
+def _load_card_defs(session) -> tuple[dict[str, CardDefInfo], frozenset[str]]:
+    global _card_defs_cache
 
+    now = time.monotonic()
+    cached = _card_defs_cache
+    if cached is not None and now - cached[0] < _CARD_DEFS_TTL:
+        return cached[1], cached[2]
 
-def save_lands_yaml(mapping: dict) -> None:
-    """Write mapping {slug: config_dict} back to lands.yml with a clean layout."""
-    LANDS_YAML_PATH.parent.mkdir(parents=True, exist_ok=True)
+    rows = session.execute(
+        select(CardDef.id, CardDef.key, CardDef.label, CardDef.type, CardDef.rarity)
+    )
+    defs = {r.key: CardDefInfo(*r) for r in rows}
+    keys = frozenset(defs)
+    _card_defs_cache = (now, defs, keys)
+    return defs, keys
 
-    # On garde juste l’ordre trié par slug pour rester stable visuellement
-    ordered = {slug: mapping[slug] for slug in sorted(mapping.keys())}
 
-    yaml_str = yaml.safe_dump(
-        ordered,
-        allow_unicode=True,
-        sort_keys=False,
-        default_flow_style=False,
-        indent=2,
-    )
+def _card_defs(session) -> dict[str, CardDefInfo]:
+    return _load_card_defs(session)[0]
 
-    with LANDS_YAML_PATH.open("w", encoding="utf-8") as f:
-        f.write(yaml_str)
 
+def _card_def_keys(session) -> frozenset[str]:
+    return _load_card_defs(session)[1]
 
-# -------------------------------------------------------------------
-# Resources YAML helpers
-# -------------------------------------------------------------------
 
-RESOURCES_YAML_PATH = Path(__file__).resolve().parents[1] / "data" / "resources.yml"
+# Dashboard statique (seulement des url_for) : rendu une fois par racine
+# d'URL de l'app (request.script_root) -> (etag, html). Pas de cache en debug,
+# pour voir tout de suite les modifs du template.
+_DASHBOARD_CACHE: dict[str, tuple[str, str]] = {}
 
 
-def load_resources_yaml() -> dict:
+@admin_bp.get("/")
+@admin_required
+def admin_dashboard():
     """
-    Charge resources.yml et retourne un dict {key: config_dict}.
-
-    Formats supportés :
-    1) format liste (recommandé) :
-       resources:
-         - key: wood
-           label: "Bois"
-           ...
-         - key: stone
-           ...
-
-    2) format mapping :
-       wood:
-         label: "Bois"
-         ...
-       stone:
-         ...
-
-    Dans les deux cas, on renvoie un mapping {key: cfg}.
+    Admin home page using a clean HTML layout.
     """
-    if not RESOURCES_YAML_PATH.exists():
-        return {}
+    if current_app.debug:
+        return render_template("ADMIN_UI/dashboard.html")
 
-    with RESOURCES_YAML_PATH.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+    cached = _DASHBOARD_CACHE.get(request.script_root)
+    if cached is None:
+        html = render_template("ADMIN_UI/dashboard.html")
+        cached = _DASHBOARD_CACHE[request.script_root] = (content_etag(html), html)
+    etag, html = cached
+    return cached_html(etag, lambda: html)
 
-    # Cas 1 : { "resources": [ {...}, {...}, ... ] }
-    if isinstance(data, dict) and isinstance(data.get("resources"), list):
-        mapping: dict[str, dict] = {}
-        for res in data["resources"]:
-            if not isinstance(res, dict):
-                continue
-            key = (res.get("key") or "").strip()
-            if not key:
-                continue
-            mapping[key] = res
-        return mapping
-
-    # Cas 2 : déjà un mapping { "wood": {...}, ... }
-    if isinstance(data, dict):
-        return data
+PLAYERS_PAGE_SIZE = 50
+PLAYERS_PAGE_SIZE_MAX = 200
 
-    return {}
+# Jokers LIKE dans la saisie admin (recherche "contient")
+_LIKE_ESCAPE_RE = re.compile(r"[\\%_]")
 
 
-def save_resources_yaml(mapping: dict) -> None:
+def _player_name_filter(search: str, contains: bool) -> tuple:
     """
-    Écrit le mapping dans resources.yml avec un layout propre.
-
-    mapping attendu :
-      { "wood": {...}, "stone": {...}, ... }
-
-    Format fichier :
-      resources:
-        - key: wood
-          ...
-        - key: stone
-          ...
+    Critères de recherche sur le nom (vide si pas de recherche) :
+    - prefix (défaut) : range on lower(name) -> served by ix_players_name_lower
+    - contains (?contains=1) : lower(name) LIKE lower('%q%'), full scan,
+      donc seulement sur demande
     """
-    RESOURCES_YAML_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-    # Tri par key pour garder un ordre stable
-    resources_list: list[dict] = []
-    for key in sorted(mapping.keys()):
-        cfg = mapping[key] or {}
-        if not isinstance(cfg, dict):
-            cfg = {}
-        cfg = dict(cfg)  # shallow copy
-        cfg["key"] = key
-        resources_list.append(cfg)
-
-    wrapper = {"resources": resources_list}
-
-    yaml_str = yaml.safe_dump(
-        wrapper,
-        allow_unicode=True,
-        sort_keys=False,
-        default_flow_style=False,
-        indent=2,
-    )
-
-    # Petite aération visuelle : ligne vide avant chaque élément de liste
-    yaml_str = yaml_str.replace("\n- ", "\n\n- ")
-
-    with RESOURCES_YAML_PATH.open("w", encoding="utf-8") as f:
-        f.write(yaml_str)
-
+    if not search:
+        return ()
+    name_ci = func.lower(Player.name)
+    if contains:
+        escaped = _LIKE_ESCAPE_RE.sub(r"\\\g<0>", search)
+        pattern = func.lower(literal(f"%{escaped}%"))  # même lower() que name
+        return (name_ci.like(pattern, escape="\\"),)
+    prefix = func.lower(literal(search))
+    return (name_ci >= prefix, name_ci < prefix.concat("\U0010ffff"))
 
-# -------------------------------------------------------------------
-# Cards YAML helpers
-# -------------------------------------------------------------------
 
-# On part du dossier app/ (parent de app/admin/) → app/data/cards.yml
-CARDS_YAML_PATH = Path(__file__).resolve().parents[1] / "data" / "cards.yml"
-
-
-def load_cards_yaml() -> dict:
-    """Charge cards.yml et retourne un dict {key: config_dict}.
-
-    - Si le YAML a la forme:
-        { "cards": [ {key: "...", ...}, {...} ] }
-      on le convertit en mapping par key.
-    - Si c'est déjà un mapping {key: {...}}, on le renvoie tel quel.
-    - Sinon on renvoie {}.
+@admin_bp.get("/players")
+@admin_required
+def players_list():
     """
-    if not CARDS_YAML_PATH.exists():
-        return {}
-
-    with CARDS_YAML_PATH.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
-
-    # Cas 1: ton format actuel: {"cards": [ {...}, {...}, ... ]}
-    if isinstance(data, dict) and isinstance(data.get("cards"), list):
-        mapping: dict[str, dict] = {}
-        for card in data["cards"]:
-            if not isinstance(card, dict):
-                continue
-            key = (card.get("key") or "").strip()
-            if not key:
-                continue
-            mapping[key] = card
-        return mapping
-
-    # Cas 2: déjà un mapping { "wood_boost_1": {...}, ... }
-    if isinstance(data, dict):
-        return data
-
-    # Fallback
-    return {}
-
-
-
-def save_cards_yaml(mapping: dict) -> None:
-    """Write the cards mapping back to cards.yml with a stable, readable layout.
-
-    Expected mapping:
-      { "wood_boost_1": {...}, "branch_boost_1": {...}, ... }
+    List players with optional search on name (case-insensitive prefix,
+    or substring with ?contains=1).
 
-    File format:
-      cards:
-        - key: wood_boost_1
-          ...
-        - key: branch_boost_1
-          ...
+    Keyset pagination on id: /admin/players?after_id=<last id of the page>
+    (&limit=n, 1..PLAYERS_PAGE_SIZE_MAX, défaut PLAYERS_PAGE_SIZE).
     """
-    CARDS_YAML_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-    # Build a list of card dicts, each containing its "key" field.
-    # We sort by (type, key) to keep a logical, stable order.
-    cards_list: list[dict] = []
-
-    def sort_key(item: tuple[str, dict]) -> tuple[str, str]:
-        k, cfg = item
-        if not isinstance(cfg, dict):
-            cfg = {}
-        ctype = (cfg.get("type") or "").lower()
-        return (ctype, k)
-
-    for key, card_cfg in sorted(mapping.items(), key=sort_key):
-        if not isinstance(card_cfg, dict):
-            card_cfg = {}
-
-        # Ensure "key" field is present and matches the mapping key
-        card_cfg = dict(card_cfg)  # shallow copy
-        card_cfg["key"] = key
-
-        cards_list.append(card_cfg)
-
-    wrapper = {"cards": cards_list}
+    # Get search query from URL: /admin/players?q=...
+    search = (request.args.get("q") or "").strip()
+    contains = bool(request.args.get("contains"))
+    after_id = request.args.get("after_id", type=int)
+    limit = request.args.get("limit", type=int) or PLAYERS_PAGE_SIZE
+    limit = max(1, min(limit, PLAYERS_PAGE_SIZE_MAX))
+
+    session = db_session()
+    # Only the columns shown in the table
+    query = session.query(Player).options(load_only(
+        Player.id, Player.name, Player.level, Player.coins, Player.diams, Player.is_admin,
+    ))
+
+    # Filter by name if search term provided
+    query = query.filter(*_player_name_filter(search, contains))
+
+    # WHERE id > :after_id ORDER BY id LIMIT n+1 : coût constant quelle que
+    # soit la page (pas d'OFFSET) ; la ligne en plus dit s'il y a une suite.
+    if after_id is not None:
+        query = query.filter(Player.id > after_id)
+    players = query.order_by(Player.id.asc()).limit(limit + 1).all()
+
+    next_after_id = None
+    if len(players) > limit:
+        players = players[:limit]
+        next_after_id = players[-1].id
 
-    # Dump once to a string so we can post-process for visual tweaks
-    yaml_str = yaml.safe_dump(
-        wrapper,
-        allow_unicode=True,
-        sort_keys=False,          # keep "cards" first
-        default_flow_style=False, # block style (multi-line)
-        indent=2,                 # 2 spaces indentation
+    return render_template(
+        "ADMIN_UI/players_list.html",
+        players=players,
+        search=search,
+        contains=contains,
+        limit=limit if limit != PLAYERS_PAGE_SIZE else None,
+        after_id=after_id,
+        next_after_id=next_after_id,
     )
-
-    # Add a blank line between each list item for readability:
-    #   - key: ...
-    # devient:
-    #   (blank line)
-    #   - key: ...
-    #
-    # This is a small cosmetic hack over PyYAML output.
-    yaml_str = yaml_str.replace("\n- ", "\n\n- ")
-
-    with CARDS_YAML_PATH.open("w", encoding="utf-8") as f:
-        f.write(yaml_str)
-
-
-
-def admin_required(view_func):
-    """
-    Ensure:
-    - ADMIN_ENABLED config flag is True
-    - current player is logged in
-    - current player has is_admin == True
-    """
-    @wraps(view_func)
-    def wrapper(*args, **kwargs):
-
-        # 1) Is the admin panel globally enabled?
-        if not current_app.config.get("ADMIN_ENABLED", False):
-            abort(404)
-
-        session = SessionLocal()
-        try:
-            player = get_current_player(session)
-            if not player or not getattr(player, "is_admin", False):
-                # Not admin → redirect back to the game home
-                return redirect(url_for("frontend.home"))
-        finally:
-            session.close()
-
-        return view_func(*args, **kwargs)
-
-    return wrapper
+        
+# Lignes streamées par players_json (curseur DB lu par paquets)
+PLAYERS_JSON_BATCH = 500
 
 
-@admin_bp.get("/")
+@admin_bp.get("/players.json")
 @admin_required
-def admin_dashboard():
-    """
-    Admin home page using a clean HTML layout.
+def players_json():
     """
-    return render_template("ADMIN_UI/dashboard.html")
+    Mêmes filtres que players_list (q, contains, after_id), sans pagination,
+    en JSON streamé : {"players": [{id, name, level, coins, diams, is_admin}, ...]}.
 
-@admin_bp.get("/players")
-@admin_required
-def players_list():
+    Lignes Core lues par paquets (yield_per) et sérialisées une à une :
+    mémoire O(PLAYERS_JSON_BATCH) quel que soit le nombre de joueurs.
     """
-    List players with optional search on name.
-    """
-    # Get search query from URL: /admin/players?q=...
     search = (request.args.get("q") or "").strip()
+    contains = bool(request.args.get("contains"))
+    after_id = request.args.get("after_id", type=int)
 
-    session = SessionLocal()
-    try:
-        query = session.query(Player)
+    stmt = (
+        select(
+            Player.id, Player.name, Player.level,
+            Player.coins, Player.diams, Player.is_admin,
+        )
+        .where(*_player_name_filter(search, contains))
+        .order_by(Player.id.asc())
+        .execution_options(yield_per=PLAYERS_JSON_BATCH)
+    )
+    if after_id is not None:
+        stmt = stmt.where(Player.id > after_id)
 
-        # Filter by name if search term provided
-        if search:
-            like_pattern = f"%{search}%"
-            query = query.filter(Player.name.ilike(like_pattern))
+    # stream_with_context : le contexte (et db_session) reste vivant jusqu'à
+    # la fin du générateur ; teardown_appcontext ferme la session ensuite.
+    def generate():
+        yield b'{"players":['
+        sep = b""
+        for row in db_session().execute(stmt):
+            yield sep + orjson.dumps(row._asdict())
+            sep = b","
+        yield b"]}"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+
+def _label_sort_key(d, key: str) -> tuple:
+    """Comme ORDER BY label NULLS LAST, key (def absente = label NULL)."""
+    label = d.label if d is not None else None
+    return (label is None, label or "", key)
 
-        # For now we load all results, later we can add pagination
-        players = query.order_by(Player.id.asc()).all()
 
-        return render_template(
-            "ADMIN_UI/players_list.html",
-            players=players,
-            search=search,
-        )
-    finally:
-        session.close()
-        
 @admin_bp.get("/players/<int:player_id>")
 @admin_required
 def player_detail(player_id: int):
     """
     Show player details, unlocked cards, and resource stocks.
     """
-    session = SessionLocal()
-    try:
-        # Load player
-        player = session.get(Player, player_id)
-        if not player:
-            abort(404)
-
-        # Load all PlayerCard rows for this player + CardDef metadata
-        cards = (
-            session.query(PlayerCard, CardDef)
-            .outerjoin(
-                CardDef,
-                CardDef.key == PlayerCard.card_key,
-            )
-            .filter(PlayerCard.player_id == player_id)
-            .order_by(CardDef.label.asc().nulls_last(), PlayerCard.card_key.asc())
-            .all()
-        )
+    session = db_session()
+    # Load player
+    player = session.get(Player, player_id)
+    if not player:
+        abort(404)
 
-        # Load resource stocks for this player + ResourceDef metadata
-        resources = (
-            session.query(ResourceStock, ResourceDef)
-            .outerjoin(
-                ResourceDef,
-                ResourceDef.key == ResourceStock.resource,
-            )
-            .filter(ResourceStock.player_id == player_id)
-            .order_by(ResourceDef.label.asc().nulls_last(), ResourceStock.resource.asc())
-            .all()
-        )
+    # Cards / stocks of this player, each paired with its def from an
+    # in-process cache (pas de JOIN) : [(row, def | None), ...].
+    # Même ordre qu'avant : label (NULLs / def absente en dernier), puis key.
+    card_defs = _card_defs(session)
+    owned = (
+        session.query(PlayerCard)
+        .filter(PlayerCard.player_id == player_id)
+        .all()
+    )
+    cards = sorted(
+        ((pc, card_defs.get(pc.card_key)) for pc in owned),
+        key=lambda pair: _label_sort_key(pair[1], pair[0].card_key),
+    )
 
-        return render_template(
-            "ADMIN_UI/player_detail.html",
-            player=player,
-            cards=cards,
-            resources=resources,
-        )
-    finally:
-        session.close()
+    resource_defs = load_resource_defs()
+    stocks = (
+        session.query(ResourceStock)
+        .filter(ResourceStock.player_id == player_id)
+        .all()
+    )
+    resources = sorted(
+        ((rs, resource_defs.get(rs.resource)) for rs in stocks),
+        key=lambda pair: _label_sort_key(pair[1], pair[0].resource),
+    )
+
+    return render_template(
+        "ADMIN_UI/player_detail.html",
+        player=player,
+        cards=cards,
+        resources=resources,
+    )
 
 @admin_bp.get("/cards")
 @admin_required
 def cards_list():
     """Liste toutes les cartes issues de cards.yml + statut de synchro DB."""
-    # 1) Charger le YAML
-    yaml_data = load_cards_yaml()  # {key: cfg_dict}
-
-    # 2) Charger tous les CardDef en DB
-    session = SessionLocal()
+    # Signature du YAML prise *avant* la lecture : si le fichier change entre
+    # les deux, l'ETag est juste plus vieux que le contenu (re-rendu au suivant).
     try:
-        db_cards = session.query(CardDef).all()
-        db_by_key = {c.key: c for c in db_cards}
-    finally:
-        session.close()
-
-    # 3) Construire une vue simplifiée pour le template
-    cards_for_view: list[dict] = []
-
-    for key, cfg in sorted(yaml_data.items(), key=lambda item: item[0]):
-        if not isinstance(cfg, dict):
-            cfg = {}
-
-        label = (
-            cfg.get("label_fr")
-            or cfg.get("label_en")
-            or cfg.get("label")
-            or key
-        )
-        ctype = cfg.get("type", "?")
-        rarity = cfg.get("rarity", "-")
-        enabled = cfg.get("enabled", True)
-
-        in_db = key in db_by_key
-
-        cards_for_view.append(
-            {
-                "key": key,
-                "label": label,
-                "type": ctype,
-                "rarity": rarity,
-                "enabled": bool(enabled),
-                "in_db": in_db,
-            }
-        )
-
-    # 4) Détecter les cartes présentes en DB mais absentes du YAML
-    db_only_cards = [
-        c for c in db_cards
-        if c.key not in yaml_data
-    ]
+        st = CARDS_YAML_PATH.stat()
+        yaml_sig = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        yaml_sig = None
+
+    # 1) YAML + lignes de vue (cache, recalculées seulement si cards.yml change)
+    yaml_data, cards_for_view = yaml_list_view(CARDS_YAML_PATH, "cards", _card_view)
+
+    # 2) Keys CardDef en DB (cache TTL) ; rows complètes uniquement pour
+    #    les cartes présentes en DB mais absentes du YAML
+    session = db_session()
+    db_keys = _card_def_keys(session)
+    db_only_keys = db_keys - yaml_data.keys()
+    db_only_cards = (
+        session.query(CardDef)
+        .options(load_only(CardDef.key, CardDef.label))  # seuls champs affichés
+        .filter(CardDef.key.in_(db_only_keys))
+        .order_by(CardDef.id.asc())
+        .all()
+        if db_only_keys else []
+    )
 
-    return render_template(
+    # 3) ETag = tout ce que la page affiche (YAML + état DB) :
+    #    If-None-Match identique -> 304 sans rendu du template
+    etag = content_etag((
+        yaml_sig,
+        sorted(db_keys),
+        [(c.key, c.label) for c in db_only_cards],
+    ))
+    return cached_html(etag, lambda: render_template(
         "ADMIN_UI/cards_list.html",
         cards=cards_for_view,
+        db_keys=db_keys,
         db_only_cards=db_only_cards,
         yaml_path=str(CARDS_YAML_PATH),
-    )
+    ))
     
 @admin_bp.route("/cards/new", methods=["GET", "POST"])
 @admin_required
@@ -657,8 +549,9 @@ def card_edit(card_key: str):
         if value is None:
             return ""
         try:
-            txt = yaml.safe_dump(
+            txt = yaml.dump(
                 value,
+                Dumper=_YamlDumper,
                 allow_unicode=True,
                 sort_keys=False,
                 default_flow_style=False,
@@ -698,117 +591,96 @@ def card_edit(card_key: str):
             errors.append("Le champ 'Type' est requis.")
         # (Tu peux renforcer les règles ici si tu veux)
 
-        # ----- Parse advanced YAML blocks -----
-        parsed_gameplay = card_cfg.get("gameplay")
-        parsed_prices = card_cfg.get("prices")
-        parsed_shop = card_cfg.get("shop")
-        parsed_buy_rules = card_cfg.get("buy_rules")
-
-        def parse_yaml_field(text: str, field_name: str):
-            """Parse YAML from textarea, return (value, error_msg_or_None)."""
-            if not text:
-                return None, None  # empty => remove field
-            try:
-                val = yaml.safe_load(text)
-            except yaml.YAMLError as exc:
-                return None, f"YAML invalide dans '{field_name}': {exc}"
-            return val, None
-
-        # gameplay
-        val, err = parse_yaml_field(gameplay_text, "gameplay")
-        if err:
-            errors.append(err)
-        else:
-            parsed_gameplay = val
-
-        # prices
-        val, err = parse_yaml_field(prices_text, "prices")
-        if err:
-            errors.append(err)
-        else:
-            parsed_prices = val
-
-        # shop
-        val, err = parse_yaml_field(shop_text, "shop")
-        if err:
-            errors.append(err)
-        else:
-            parsed_shop = val
-
-        # buy_rules
-        val, err = parse_yaml_field(buy_rules_text, "buy_rules")
-        if err:
-            errors.append(err)
-        else:
-            parsed_buy_rules = val
+        # ----- Parse advanced YAML blocks (one parse for the 4 textareas) -----
+        parsed, yaml_errors = _parse_yaml_blocks({
+            "gameplay": gameplay_text,
+            "prices": prices_text,
+            "shop": shop_text,
+            "buy_rules": buy_rules_text,
+        })
+        errors.extend(yaml_errors)
+        parsed_gameplay = parsed["gameplay"]
+        parsed_prices = parsed["prices"]
+        parsed_shop = parsed["shop"]
+        parsed_buy_rules = parsed["buy_rules"]
 
         if not errors:
             # ----- Apply changes to card config -----
-            updated = dict(card_cfg)
+            # card_cfg est déjà une copie propre à la requête (load_cards_yaml)
+            # et mapping[card_key] pointe dessus : modification en place.
+            old_blocks = (
+                card_cfg.get("gameplay"),
+                card_cfg.get("prices"),
+                card_cfg.get("shop"),
+                card_cfg.get("buy_rules"),
+            )
 
             # Scalar fields
-            updated["key"] = card_key
-            updated["label"] = label
+            card_cfg["key"] = card_key
+            card_cfg["label"] = label
             if categorie:
-                updated["categorie"] = categorie
+                card_cfg["categorie"] = categorie
             else:
-                updated.pop("categorie", None)
+                card_cfg.pop("categorie", None)
 
             if description:
-                updated["description"] = description
+                card_cfg["description"] = description
             else:
-                updated.pop("description", None)
+                card_cfg.pop("description", None)
 
             if ctype:
-                updated["type"] = ctype
+                card_cfg["type"] = ctype
             else:
-                updated.pop("type", None)
+                card_cfg.pop("type", None)
 
             if rarity:
-                updated["rarity"] = rarity
+                card_cfg["rarity"] = rarity
             else:
-                updated.pop("rarity", None)
+                card_cfg.pop("rarity", None)
 
             if icon:
-                updated["icon"] = icon
+                card_cfg["icon"] = icon
             else:
-                updated.pop("icon", None)
+                card_cfg.pop("icon", None)
 
-            updated["enabled"] = bool(enabled_str)
+            card_cfg["enabled"] = bool(enabled_str)
 
             # Advanced YAML fields: only keep if not None
             if parsed_gameplay is not None:
-                updated["gameplay"] = parsed_gameplay
+                card_cfg["gameplay"] = parsed_gameplay
             else:
-                updated.pop("gameplay", None)
+                card_cfg.pop("gameplay", None)
 
             if parsed_prices is not None:
-                updated["prices"] = parsed_prices
+                card_cfg["prices"] = parsed_prices
             else:
-                updated.pop("prices", None)
+                card_cfg.pop("prices", None)
 
             if parsed_shop is not None:
-                updated["shop"] = parsed_shop
+                card_cfg["shop"] = parsed_shop
             else:
-                updated.pop("shop", None)
+                card_cfg.pop("shop", None)
 
             if parsed_buy_rules is not None:
-                updated["buy_rules"] = parsed_buy_rules
+                card_cfg["buy_rules"] = parsed_buy_rules
             else:
-                updated.pop("buy_rules", None)
+                card_cfg.pop("buy_rules", None)
 
-            # Save in mapping + file
-            mapping[card_key] = updated
+            # Save file (mapping[card_key] is card_cfg)
             save_cards_yaml(mapping)
-
-            card_cfg = updated
             saved = True
 
-            # Après sauvegarde, on veut réafficher le YAML "propre"
-            gameplay_text_default = dump_yaml_block(card_cfg.get("gameplay"))
-            prices_text_default = dump_yaml_block(card_cfg.get("prices"))
-            shop_text_default = dump_yaml_block(card_cfg.get("shop"))
-            buy_rules_text_default = dump_yaml_block(card_cfg.get("buy_rules"))
+            # Après sauvegarde, on veut réafficher le YAML "propre" :
+            # seuls les blocs dont la valeur a changé sont re-dumpés
+            # (les autres textes par défaut viennent de la même valeur).
+            if card_cfg.get("gameplay") != old_blocks[0]:
+                gameplay_text_default = dump_yaml_block(card_cfg.get("gameplay"))
+            if card_cfg.get("prices") != old_blocks[1]:
+                prices_text_default = dump_yaml_block(card_cfg.get("prices"))
+            if card_cfg.get("shop") != old_blocks[2]:
+                shop_text_default = dump_yaml_block(card_cfg.get("shop"))
+            if card_cfg.get("buy_rules") != old_blocks[3]:
+                buy_rules_text_default = dump_yaml_block(card_cfg.get("buy_rules"))
 
     # GET initial, ou POST avec erreurs / succès
     return render_template(
@@ -829,48 +701,20 @@ def resources_list():
     """
     Liste toutes les ressources depuis resources.yml + statut de synchro DB.
     """
-    yaml_data = load_resources_yaml()  # {key: cfg}
-
-    session = SessionLocal()
-    try:
-        db_resources = session.query(ResourceDef).all()
-        db_by_key = {r.key: r for r in db_resources}
-    finally:
-        session.close()
-
-    resources_for_view: list[dict] = []
-
-    for key, cfg in sorted(yaml_data.items(), key=lambda item: item[0]):
-        if not isinstance(cfg, dict):
-            cfg = {}
-
-        label = (cfg.get("label") or key).strip()
-        icon = (cfg.get("icon") or "").strip()
-        unlock_min_level = cfg.get("unlock_min_level", 0)
-        base_cooldown = cfg.get("base_cooldown", 0.0)
-        base_sell_price = cfg.get("base_sell_price", 0)
-        enabled = cfg.get("enabled", True)
-
-        in_db = key in db_by_key
+    # YAML + lignes de vue (cache, recalculées seulement si resources.yml change)
+    yaml_data, resources_for_view = yaml_list_view(
+        RESOURCES_YAML_PATH, "resources", _resource_view
+    )
 
-        resources_for_view.append(
-            {
-                "key": key,
-                "label": label,
-                "icon": icon,
-                "unlock_min_level": unlock_min_level,
-                "base_cooldown": base_cooldown,
-                "base_sell_price": base_sell_price,
-                "enabled": bool(enabled),
-                "in_db": in_db,
-            }
-        )
+    # ResourceDef : cache in-process (resource_defs.py), invalidé au reseed
+    db_by_key = load_resource_defs()
 
-    db_only_resources = [r for r in db_resources if r.key not in yaml_data]
+    db_only_resources = [r for r in db_by_key.values() if r.key not in yaml_data]
 
     return render_template(
         "ADMIN_UI/resources_list.html",
         resources=resources_for_view,
+        db_keys=db_by_key,
         db_only_resources=db_only_resources,
         yaml_path=str(RESOURCES_YAML_PATH),
     )
@@ -896,8 +740,9 @@ def resource_edit(res_key: str):
         if value is None:
             return ""
         try:
-            txt = yaml.safe_dump(
+            txt = yaml.dump(
                 value,
+                Dumper=_YamlDumper,
                 allow_unicode=True,
                 sort_keys=False,
                 default_flow_style=False,
@@ -957,7 +802,7 @@ def resource_edit(res_key: str):
             if not text:
                 return None, None  # vide => supprime la clé
             try:
-                val = yaml.safe_load(text)
+                val = yaml.load(text, Loader=_YamlLoader)
             except yaml.YAMLError as exc:
                 return None, f"YAML invalide dans '{field_name}': {exc}"
             return val, None
@@ -1145,7 +990,8 @@ def lands_list():
 
     lands_for_view: list[dict] = []
 
-    for slug, cfg in sorted(yaml_data.items(), key=lambda item: item[0]):
+    for slug in sorted(yaml_data):
+        cfg = yaml_data[slug]
         if not isinstance(cfg, dict):
             cfg = {}
 
@@ -1544,7 +1390,7 @@ def level_new():
         rewards: list = []
         if not error and rewards_yaml_str:
             try:
-                parsed = yaml.safe_load(rewards_yaml_str)
+                parsed = yaml.load(rewards_yaml_str, Loader=_YamlLoader)
                 if parsed is None:
                     rewards = []
                 elif isinstance(parsed, list):
@@ -1616,8 +1462,9 @@ def level_edit(level_no: int):
     initial_rewards_yaml = ""
     if level_data.get("rewards") is not None:
         try:
-            initial_rewards_yaml = yaml.safe_dump(
+            initial_rewards_yaml = yaml.dump(
                 level_data["rewards"],
+                Dumper=_YamlDumper,
                 sort_keys=False,
                 allow_unicode=True,
                 default_flow_style=False,
@@ -1658,7 +1505,7 @@ def level_edit(level_no: int):
         if not error:
             if rewards_yaml_str.strip():
                 try:
-                    parsed = yaml.safe_load(rewards_yaml_str)
+                    parsed = yaml.load(rewards_yaml_str, Loader=_YamlLoader)
                     if parsed is None:
                         rewards = []
                     elif isinstance(parsed, list):
@@ -0,0 +1,69 @@
+# =============================================================================
+# File: app/admin/auth.py
+# Purpose: Décorateur admin_required (flag ADMIN_ENABLED + joueur is_admin).
+# =============================================================================
+from __future__ import annotations
+
+from functools import wraps
+import time
+
+from flask import abort, current_app, redirect, request, url_for
+from flask import session as flask_session
+
+from app.auth import current_player_id
+from app.db import db_session
+from app.models import Player
+
+
+# Claim "admin" dans le cookie de session Flask (signé avec SECRET_KEY) :
+# [player_id, expiration]. Évite le SELECT players sur les GET admin ;
+# un POST revérifie toujours is_admin en DB.
+_ADMIN_CLAIM_KEY = "admin"
+_ADMIN_CLAIM_TTL = 10 * 60  # secondes
+
+
+def _has_admin_claim(player_id: int) -> bool:
+    claim = flask_session.get(_ADMIN_CLAIM_KEY)
+    return (
+        isinstance(claim, list)
+        and len(claim) == 2
+        and claim[0] == player_id
+        and claim[1] > time.time()
+    )
+
+
+def admin_required(view_func):
+    """
+    Ensure:
+    - ADMIN_ENABLED config flag is True
+    - current player is logged in
+    - current player has is_admin == True
+    """
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+
+        # 1) Is the admin panel globally enabled?
+        if not current_app.config.get("ADMIN_ENABLED", False):
+            abort(404)
+
+        pid = current_player_id()
+        if pid is None:
+            return redirect(url_for("frontend.home"))
+
+        # 2) GET avec un claim admin valide pour ce joueur -> pas de DB
+        if request.method == "GET" and _has_admin_claim(pid):
+            return view_func(*args, **kwargs)
+
+        # 3) Sinon, vérification en DB. Session de la requête (db_session,
+        # fermée au teardown) : la vue réutilise la même, et le joueur admin
+        # reste dans l'identity map.
+        player = db_session().get(Player, pid)
+        if not player or not getattr(player, "is_admin", False):
+            flask_session.pop(_ADMIN_CLAIM_KEY, None)
+            # Not admin → redirect back to the game home
+            return redirect(url_for("frontend.home"))
+
+        flask_session[_ADMIN_CLAIM_KEY] = [pid, int(time.time()) + _ADMIN_CLAIM_TTL]
+        return view_func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,427 @@
+# =============================================================================
+# File: app/admin/yaml_store.py
+# Purpose: Lecture / écriture des YAML de config édités par l'admin
+#          (cards, resources, lands, levels) + caches de parse.
+# =============================================================================
+from __future__ import annotations
+
+import copy
+from operator import itemgetter
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+import yaml
+from flask import current_app
+
+try:  # libyaml-backed loader / dumper (much faster), pure-Python fallback
+    from yaml import CSafeDumper as _YamlDumper, CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeDumper as _YamlDumper, SafeLoader as _YamlLoader
+
+# ============================
+# Levels YAML helpers
+# ============================
+
+def _levels_yaml_path() -> Path:
+    """Return the absolute path to app/data/levels.yml."""
+    # current_app.root_path = dossier "app/"
+    return Path(current_app.root_path) / "data" / "levels.yml"
+
+
+def load_levels_yaml() -> list[dict]:
+    """
+    Load levels from app/data/levels.yml.
+
+    Expected format:
+    levels:
+      - level: 1
+        xp_required: 10
+        rewards:
+          - type: coins
+            amount: 20
+      - level: 2
+        xp_required: 30
+        rewards: [...]
+    """
+    path = _levels_yaml_path()
+    if not path.exists():
+        return []
+
+    with path.open("rb") as f:  # octets -> libyaml décode lui-même l'UTF-8
+        data = yaml.load(f, Loader=_YamlLoader) or {}
+
+    levels = data.get("levels")
+    if isinstance(levels, list):
+        # We keep as-is but we might sort when saving.
+        return levels
+    return []
+
+
+def save_levels_yaml(levels: list[dict]) -> None:
+    """
+    Save levels list back to app/data/levels.yml.
+
+    We:
+    - Wrap in a top-level "levels:" key
+    - Sort by level ascending
+    - Keep keys order (no sort_keys)
+    """
+    # Ensure sorted by "level"
+    def _lvl_num(l: dict) -> int:
+        try:
+            return int(l.get("level") or 0)
+        except Exception:
+            return 0
+
+    levels_sorted = sorted(levels, key=_lvl_num)
+
+    payload = {
+        "levels": levels_sorted,
+    }
+
+    path = _levels_yaml_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with path.open("w", encoding="utf-8") as f:
+        yaml.dump(
+            payload,
+            f,
+            Dumper=_YamlDumper,
+            sort_keys=False,
+            allow_unicode=True,
+            default_flow_style=False,
+            indent=2,
+        )
+
+
+# -------------------------------------------------------------------
+# Lands YAML helpers
+# -------------------------------------------------------------------
+
+LANDS_YAML_PATH = Path(__file__).resolve().parents[1] / "data" / "lands.yml"
+
+
+def load_lands_yaml() -> dict:
+    """Load lands.yml and return a mapping {slug: config_dict}."""
+    if not LANDS_YAML_PATH.exists():
+        return {}
+
+    with LANDS_YAML_PATH.open("rb") as f:  # octets -> libyaml décode lui-même l'UTF-8
+        data = yaml.load(f, Loader=_YamlLoader) or {}
+
+    # Ton format actuel est déjà { "forest": {...}, "beach": {...}, ... }
+    if isinstance(data, dict):
+        return data
+
+    return {}
+
+
+def save_lands_yaml(mapping: dict) -> None:
+    """Write mapping {slug: config_dict} back to lands.yml with a clean layout."""
+    LANDS_YAML_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    # On garde juste l’ordre trié par slug pour rester stable visuellement
+    ordered = {slug: mapping[slug] for slug in sorted(mapping.keys())}
+
+    yaml_str = yaml.dump(
+        ordered,
+        Dumper=_YamlDumper,
+        allow_unicode=True,
+        sort_keys=False,
+        default_flow_style=False,
+        indent=2,
+    )
+
+    with LANDS_YAML_PATH.open("w", encoding="utf-8") as f:
+        f.write(yaml_str)
+
+
+# -------------------------------------------------------------------
+# Parsed YAML cache (cards.yml / resources.yml)
+# -------------------------------------------------------------------
+
+# path -> (st_mtime_ns, st_size, mapping {key: cfg}).
+# Un stat() par requête ; le YAML n'est re-parsé que si le fichier a changé
+# (édition via l'admin ou à la main).
+_YAML_CACHE: dict[Path, tuple[int, int, dict]] = {}
+
+
+def _list_to_mapping(data, list_key: str) -> dict:
+    """{list_key: [{key: ...}, ...]} ou mapping {key: cfg} -> {key: cfg}."""
+    if isinstance(data, dict) and isinstance(data.get(list_key), list):
+        mapping: dict[str, dict] = {}
+        for item in data[list_key]:
+            if not isinstance(item, dict):
+                continue
+            key = (item.get("key") or "").strip()
+            if not key:
+                continue
+            mapping[key] = item
+        return mapping
+
+    # Déjà un mapping { "wood": {...}, ... }
+    if isinstance(data, dict):
+        return data
+
+    return {}
+
+
+# Copie picklée du mapping parsé, partagée entre process (workers gunicorn
+# recyclés, redémarrages) : nom = stem + mtime_ns + size du YAML.
+# Dossier privé (0700) à l'utilisateur courant : on ne unpickle jamais un
+# fichier qu'un autre utilisateur aurait pu déposer. (Windows : pas de
+# getuid, le dossier TEMP y est déjà propre à l'utilisateur.)
+_UID = os.getuid() if hasattr(os, "getuid") else None
+_PICKLE_DIR = Path(tempfile.gettempdir()) / (
+    f"lodyland-yaml-{_UID}" if _UID is not None else "lodyland-yaml"
+)
+
+
+def _pickle_dir() -> Path | None:
+    try:
+        _PICKLE_DIR.mkdir(mode=0o700, exist_ok=True)
+        st = _PICKLE_DIR.stat()
+    except OSError:
+        return None
+    if _UID is not None and (st.st_uid != _UID or st.st_mode & 0o077):
+        return None
+    return _PICKLE_DIR
+
+
+def _read_pickled_mapping(path: Path, st: os.stat_result) -> tuple[Path | None, dict | None]:
+    cache_dir = _pickle_dir()
+    if cache_dir is None:
+        return None, None
+    pkl = cache_dir / f"{path.stem}_{st.st_mtime_ns}_{st.st_size}.pkl"
+    try:
+        with pkl.open("rb") as f:
+            return pkl, pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return pkl, None
+
+
+def _write_pickled_mapping(pkl: Path, mapping: dict) -> None:
+    """Écriture atomique (tmp + replace), puis purge des versions périmées."""
+    tmp = pkl.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        with tmp.open("wb") as f:
+            pickle.dump(mapping, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, pkl)
+        stem = pkl.name.rsplit("_", 2)[0]
+        for old in pkl.parent.glob(f"{stem}_*.pkl"):
+            if old != pkl:
+                old.unlink(missing_ok=True)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+def _cached_yaml_mapping(path: Path, list_key: str) -> dict:
+    """Mapping {key: cfg} partagé de _YAML_CACHE (lecture seule !)."""
+    try:
+        st = path.stat()
+    except OSError:
+        return {}
+
+    cached = _YAML_CACHE.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        mapping = cached[2]
+    else:
+        # Pas en mémoire : copie picklée d'un autre process, sinon parse YAML
+        pkl, mapping = _read_pickled_mapping(path, st)
+        if mapping is None:
+            with path.open("rb") as f:  # octets -> libyaml décode lui-même l'UTF-8
+                data = yaml.load(f, Loader=_YamlLoader) or {}
+            mapping = _list_to_mapping(data, list_key)
+            if pkl is not None:
+                _write_pickled_mapping(pkl, mapping)
+        _YAML_CACHE[path] = (st.st_mtime_ns, st.st_size, mapping)
+    return mapping
+
+
+def _load_yaml_mapping(path: Path, list_key: str) -> dict:
+    """Mapping {key: cfg} de `path`, servi depuis _YAML_CACHE si inchangé."""
+    mapping = _cached_yaml_mapping(path, list_key)
+
+    # Les vues modifient les entrées (et leurs blocs gameplay / prices /
+    # shop / unlock_rules...) avant de sauvegarder : copie complète, aucun
+    # objet du cache n'est rendu (~0.5 ms sur cards.yml, vs ~5 ms de parse).
+    return copy.deepcopy(mapping)
+
+
+# Lignes des listes admin (cards_list / resources_list), projetées une fois
+# par version du YAML : path -> (mapping source, lignes triées par key).
+# Le statut "en DB" reste calculé par requête (db_keys passé au template).
+_VIEW_CACHE: dict[Path, tuple[dict, list]] = {}
+
+
+def yaml_list_view(path: Path, list_key: str, make_view) -> tuple[dict, list]:
+    """(mapping partagé, lignes de vue), recalculées seulement si le YAML change."""
+    mapping = _cached_yaml_mapping(path, list_key)
+    cached = _VIEW_CACHE.get(path)
+    if cached is not None and cached[0] is mapping:
+        return mapping, cached[1]
+
+    rows = [make_view(key, mapping[key]) for key in sorted(mapping)]
+    _VIEW_CACHE[path] = (mapping, rows)
+    return mapping, rows
+
+
+# Options de dump des listes admin (construites une fois).
+# Pas de sous-classe d'Emitter pour les lignes vides : l'emitter libyaml
+# (CSafeDumper) n'est pas surchargeable, et l'emitter Python est ~5x plus lent
+# que le dump C élément par élément ci-dessous.
+_LIST_DUMP_OPTS = dict(
+    Dumper=_YamlDumper,
+    allow_unicode=True,
+    sort_keys=False,          # keep "key" first
+    default_flow_style=False, # block style (multi-line)
+    indent=2,                 # 2 spaces indentation
+)
+
+
+def _write_yaml_list(path: Path, list_key: str, items: list[dict]) -> None:
+    """
+    Écrit {list_key: items} avec une ligne vide avant chaque élément :
+
+      cards:
+
+      - key: ...
+
+      - key: ...
+
+    Chaque élément est émis directement dans le fichier (pas de dump
+    complet en str puis replace("\\n- ", ...)).
+    """
+    with path.open("w", encoding="utf-8") as f:
+        if not items:
+            yaml.dump({list_key: []}, f, **_LIST_DUMP_OPTS)
+            return
+        f.write(f"{list_key}:\n")
+        for item in items:
+            f.write("\n")
+            yaml.dump([item], f, **_LIST_DUMP_OPTS)
+
+
+# -------------------------------------------------------------------
+# Resources YAML helpers
+# -------------------------------------------------------------------
+
+RESOURCES_YAML_PATH = Path(__file__).resolve().parents[1] / "data" / "resources.yml"
+
+
+def load_resources_yaml() -> dict:
+    """
+    Charge resources.yml et retourne un dict {key: config_dict}.
+
+    Formats supportés :
+    1) format liste (recommandé) :
+       resources:
+         - key: wood
+           label: "Bois"
+           ...
+         - key: stone
+           ...
+
+    2) format mapping :
+       wood:
+         label: "Bois"
+         ...
+       stone:
+         ...
+
+    Dans les deux cas, on renvoie un mapping {key: cfg}.
+    Le parse est mis en cache tant que le fichier ne change pas.
+    """
+    return _load_yaml_mapping(RESOURCES_YAML_PATH, "resources")
+
+
+def save_resources_yaml(mapping: dict) -> None:
+    """
+    Écrit le mapping dans resources.yml avec un layout propre.
+
+    mapping attendu :
+      { "wood": {...}, "stone": {...}, ... }
+
+    Format fichier :
+      resources:
+        - key: wood
+          ...
+        - key: stone
+          ...
+    """
+    RESOURCES_YAML_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    # Tri par key pour garder un ordre stable
+    resources_list: list[dict] = []
+    for key in sorted(mapping.keys()):
+        cfg = mapping[key] or {}
+        if not isinstance(cfg, dict):
+            cfg = {}
+        cfg = dict(cfg)  # shallow copy
+        cfg["key"] = key
+        resources_list.append(cfg)
+
+    _write_yaml_list(RESOURCES_YAML_PATH, "resources", resources_list)
+    _YAML_CACHE.pop(RESOURCES_YAML_PATH, None)
+
+
+# -------------------------------------------------------------------
+# Cards YAML helpers
+# -------------------------------------------------------------------
+
+# On part du dossier app/ (parent de app/admin/) → app/data/cards.yml
+CARDS_YAML_PATH = Path(__file__).resolve().parents[1] / "data" / "cards.yml"
+
+
+def load_cards_yaml() -> dict:
+    """Charge cards.yml et retourne un dict {key: config_dict}.
+
+    - Si le YAML a la forme:
+        { "cards": [ {key: "...", ...}, {...} ] }
+      on le convertit en mapping par key.
+    - Si c'est déjà un mapping {key: {...}}, on le renvoie tel quel.
+    - Sinon on renvoie {}.
+
+    Le parse est mis en cache tant que le fichier ne change pas.
+    """
+    return _load_yaml_mapping(CARDS_YAML_PATH, "cards")
+
+
+
+def save_cards_yaml(mapping: dict) -> None:
+    """Write the cards mapping back to cards.yml with a stable, readable layout.
+
+    Expected mapping:
+      { "wood_boost_1": {...}, "branch_boost_1": {...}, ... }
+
+    File format:
+      cards:
+        - key: wood_boost_1
+          ...
+        - key: branch_boost_1
+          ...
+    """
+    CARDS_YAML_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    # Build a list of card dicts, each containing its "key" field.
+    # We sort by (type, key) to keep a logical, stable order: the type is
+    # computed once per card, then a C-level itemgetter drives the sort.
+    decorated: list[tuple[str, str, dict]] = []
+    for key, card_cfg in mapping.items():
+        if not isinstance(card_cfg, dict):
+            card_cfg = {}
+        decorated.append(((card_cfg.get("type") or "").lower(), key, card_cfg))
+    decorated.sort(key=itemgetter(0, 1))
+
+    cards_list: list[dict] = []
+    for _ctype, key, card_cfg in decorated:
+        # Ensure "key" field is present and matches the mapping key
+        card_cfg = dict(card_cfg)  # shallow copy
+        card_cfg["key"] = key
+
+        cards_list.append(card_cfg)
+
+    _write_yaml_list(CARDS_YAML_PATH, "cards", cards_list)
+    _YAML_CACHE.pop(CARDS_YAML_PATH, None)
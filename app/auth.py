@@ -2,13 +2,20 @@
 from flask import request
 from .models import Player
 
-def get_current_player(session):
-    """Récupère le joueur courant via le cookie 'player_id'."""
+def current_player_id() -> int | None:
+    """Id du joueur courant lu dans le cookie 'player_id' (sans requête DB)."""
     pid = request.cookies.get("player_id")
     if not pid:
         return None
     try:
-        pid = int(pid)
+        return int(pid)
     except ValueError:
         return None
+
+
+def get_current_player(session):
+    """Récupère le joueur courant via le cookie 'player_id'."""
+    pid = current_player_id()
+    if pid is None:
+        return None
     return session.get(Player, pid)
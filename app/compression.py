@@ -0,0 +1,57 @@
+# =============================================================================
+# File: app/compression.py
+# Purpose: Gzip large JSON responses (/api/state, /api/resources, /api/levels).
+# Notes:
+# - Stdlib gzip in an after_request hook (no extra dependency).
+# - Only when the client sends "Accept-Encoding: gzip" and the body is at
+#   least COMPRESS_MIN_SIZE bytes; streamed / already-encoded responses are
+#   left untouched.
+# - Static bodies (http_cache.cached_body: /api/levels, /api/prices) are
+#   compressed once; the gzip bytes are kept per (etag, level).
+# =============================================================================
+from __future__ import annotations
+
+import gzip
+
+from flask import Flask, request
+
+_COMPRESSIBLE_MIMETYPES = {"application/json", "text/html", "text/css", "text/javascript"}
+
+# (etag, level) -> gzip bytes of a static body (only bodies tagged with
+# gzip_cache_key by cached_body(), i.e. a handful of entries)
+_GZIP_CACHE: dict[tuple[str, int], bytes] = {}
+
+
+def init_compression(app: Flask) -> None:
+    """Register the gzip after_request hook on `app`."""
+    app.config.setdefault("COMPRESS_MIN_SIZE", 512)
+    app.config.setdefault("COMPRESS_LEVEL", 6)
+
+    @app.after_request
+    def _gzip_response(response):
+        if (
+            response.status_code < 200
+            or response.status_code >= 300
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in _COMPRESSIBLE_MIMETYPES
+            or "gzip" not in request.headers.get("Accept-Encoding", "").lower()
+        ):
+            return response
+
+        level = app.config["COMPRESS_LEVEL"]
+        key = getattr(response, "gzip_cache_key", None)
+        compressed = _GZIP_CACHE.get((key, level)) if key is not None else None
+        if compressed is None:
+            data = response.get_data()
+            if len(data) < app.config["COMPRESS_MIN_SIZE"]:
+                return response
+            compressed = gzip.compress(data, compresslevel=level)
+            if key is not None:
+                _GZIP_CACHE[(key, level)] = compressed
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = "gzip"
+        response.vary.add("Accept-Encoding")
+        return response
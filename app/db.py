@@ -3,8 +3,9 @@
 # Purpose: Minimal SQLite engine + SQLAlchemy session factory.
 # =============================================================================
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker, scoped_session, DeclarativeBase
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -13,17 +14,51 @@ load_dotenv()
 # Get DATABASE_URL from env or fallback
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///game.db")
 
-engine = create_engine(DATABASE_URL, echo=False, future=True)
+_URL = make_url(DATABASE_URL)
+_IS_SQLITE = _URL.get_backend_name() == "sqlite"
 
-# Session factory (no autocommit, no autoflush)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
+_engine_kwargs = {}
+if _IS_SQLITE:
+    # Connections are handed across Flask worker threads by the pool
+    _engine_kwargs = {"connect_args": {"check_same_thread": False}}
+    # File-backed DB -> QueuePool. In-memory (sqlite:// / :memory:) keeps
+    # SQLAlchemy's SingletonThreadPool, which rejects these arguments.
+    if _URL.database not in (None, "", ":memory:"):
+        # pool_size + max_overflow >= gunicorn threads per worker : same env
+        # var and default as gunicorn.conf.py (10 + 20 for 16 threads)
+        _threads = int(os.getenv("GUNICORN_THREADS", 16))
+        _engine_kwargs.update({
+            "pool_size": 10,
+            "max_overflow": max(20, _threads - 10),
+            "pool_recycle": 1800,
+        })
+
+engine = create_engine(DATABASE_URL, echo=False, future=True, **_engine_kwargs)
+
+if _IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, _record):
+        """WAL + synchronous=NORMAL: commits no longer fsync the main DB file."""
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute("PRAGMA temp_store=MEMORY")
+        cur.execute("PRAGMA mmap_size=268435456")   # 256 MiB
+        cur.execute("PRAGMA cache_size=-65536")     # 64 MiB
+        cur.close()
 
 class Base(DeclarativeBase):
     """Declarative base for ORM models."""
     pass
 
+# Session factory (no autoflush). expire_on_commit=False: objects keep their
+# values after commit, so handlers can build the response without re-SELECT.
 SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 
+# One session per request (removed in create_app's teardown_appcontext).
+# SessionLocal stays available for scripts / seeding / background work.
+db_session = scoped_session(SessionLocal)
+
 def init_db():
     """Create all tables if they don't exist."""
     # Import models so metadata sees them before create_all
@@ -0,0 +1,66 @@
+# =============================================================================
+# File: app/http_cache.py
+# Purpose: ETag / 304 helpers for read-mostly JSON endpoints
+#          (/api/resources, /api/levels, /api/prices) and admin list pages.
+# Notes:
+# - ETags are derived from the data itself (not from a counter), so they are
+#   identical across workers and stable across restarts.
+# =============================================================================
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Callable
+
+from flask import Response, jsonify, request
+
+DEFAULT_MAX_AGE = 60
+
+
+def content_etag(obj: Any) -> str:
+    """Short, stable hash of a (deterministic) Python structure."""
+    return hashlib.blake2b(repr(obj).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def cached_json(etag: str, build: Callable[[], Any], max_age: int = DEFAULT_MAX_AGE) -> Response:
+    """
+    Return `jsonify(build())` tagged with a weak ETag, or an empty
+    304 Not Modified when the client's If-None-Match already matches
+    (in that case `build` is never called).
+    """
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    else:
+        resp = jsonify(build())
+    return _tag(resp, etag, max_age)
+
+
+def cached_body(etag: str, body: bytes, max_age: int = DEFAULT_MAX_AGE) -> Response:
+    """Same as cached_json() for a JSON body already serialized once (static data)."""
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(body, mimetype="application/json")
+        # Static body: compression.py reuses its gzip version (keyed by etag)
+        resp.gzip_cache_key = etag
+    return _tag(resp, etag, max_age)
+
+
+def cached_html(etag: str, build: Callable[[], str]) -> Response:
+    """
+    HTML variant for admin pages: `build()` (template render) is skipped on
+    304. `no-cache` -> the browser revalidates on every load, so the page is
+    never served from cache without going through admin_required.
+    """
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(build(), mimetype="text/html")
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+
+def _tag(resp: Response, etag: str, max_age: int) -> Response:
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = f"private, max-age={max_age}"
+    return resp
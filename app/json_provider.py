@@ -0,0 +1,44 @@
+# =============================================================================
+# File: app/json_provider.py
+# Purpose: Flask JSON provider backed by orjson (faster jsonify / request.json).
+# Notes:
+# - Naive datetimes (SQLite stores them naive, UTC by convention) are
+#   emitted with a "+00:00" offset.
+# - Keys are not sorted (Flask's default provider sorts them).
+# =============================================================================
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from flask.json.provider import JSONProvider
+
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+def _default(o: Any) -> Any:
+    """Fallback for types orjson does not handle natively."""
+    if isinstance(o, Decimal):
+        return str(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider using orjson; install with `app.json = ORJSONProvider(app)`."""
+
+    mimetype = "application/json"
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        # Build the body as bytes directly (no str -> bytes round trip)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -11,7 +11,7 @@ from __future__ import annotations
 import datetime as dt  # use dt.date / dt.datetime for annotations
 from sqlalchemy import (
     Integer, String, Date, DateTime, Boolean,
-    ForeignKey, Text, UniqueConstraint, Float, Column, func
+    ForeignKey, Text, UniqueConstraint, Float, Column, Index, func
 )
 from sqlalchemy.types import JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -44,6 +44,12 @@ class Player(Base):
     )
     
     is_admin: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+
+
+# Recherche admin par préfixe insensible à la casse (lower(name) >= q ...)
+Index("ix_players_name_lower", func.lower(Player.name))
+
+
 class Account(Base):
     __tablename__ = "accounts"
 
@@ -74,10 +80,12 @@ class ResourceStock(Base):
     __tablename__ = "resource_stocks"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    player_id: Mapped[int] = mapped_column(Integer, index=True, nullable=False)
+    player_id: Mapped[int] = mapped_column(Integer, nullable=False)
     resource: Mapped[str] = mapped_column(String(30), index=True, nullable=False)
     qty: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
 
+    # Unique (player_id, resource): B-tree probe for collect / sell, also the
+    # conflict target of the stock upsert. Covers player_id-only lookups too.
     __table_args__ = (
         UniqueConstraint("player_id", "resource", name="uix_player_resource"),
     )
@@ -97,6 +105,14 @@ class ResourceDef(Base):
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     unlock_description: Mapped[str | None] = mapped_column(Text, nullable=True)
    
+class SchemaMeta(Base):
+    """Petits marqueurs clé/valeur (ex: hash du resources.yml déjà seedé)."""
+    __tablename__ = "schema_meta"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    value: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
 class CardDef(Base):
     __tablename__ = "card_defs"
 
@@ -141,10 +157,16 @@ class PlayerCard(Base):
     __tablename__ = "player_cards"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    player_id: Mapped[int] = mapped_column(ForeignKey("players.id"), index=True)
+    player_id: Mapped[int] = mapped_column(ForeignKey("players.id"))
     card_key: Mapped[str] = mapped_column(String, index=True)
     qty: Mapped[int] = mapped_column(Integer, default=1)
 
+    # (player_id, card_key): lookups "le joueur a-t-il la carte X" (land,
+    # buy, rewards) ; couvre aussi les lectures par player_id seul.
+    __table_args__ = (
+        Index("ix_player_cards_player_card", "player_id", "card_key"),
+    )
+
     player = relationship("Player", backref="cards")    
     
 class PlayerItem(Base):
@@ -158,7 +180,12 @@ class PlayerItem(Base):
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
-    )    
+    )
+
+    # Items du joueur (/state, craft) : lookup par player_id (+ item_key)
+    __table_args__ = (
+        Index("ix_player_items_player_item", "player_id", "item_key"),
+    )
     
 class PlayerLandSlots(Base):
     __tablename__ = "player_land_slots"
@@ -4,10 +4,18 @@
 # =============================================================================
 from __future__ import annotations
 
+from bisect import bisect_right
+from itertools import accumulate
 from pathlib import Path
 from typing import Dict, Any, List, Tuple
 
 import yaml
+from sqlalchemy import func, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .models import CardDef, Player, PlayerCard
+from .resource_defs import get_resource_def
+from .services.stocks import add_player_stock
 
 # Base XP for one collect action (before boost cards)
 XP_PER_COLLECT = 1
@@ -54,19 +62,36 @@ def xp_required_for(level: int) -> int:
     return cfg["xp_required"]
 
 
+# Lookup tables built once at import (LEVELS is read-only at runtime).
+# _LEVEL_XP_CUMMAX[i] = max xp_required of the i+1 lowest levels, so a bisect
+# gives the same answer as walking the sorted levels until the first miss.
+_LEVEL_KEYS: Tuple[int, ...] = tuple(sorted(LEVELS))
+_LEVEL_XP_CUMMAX: Tuple[int, ...] = tuple(
+    accumulate((LEVELS[lvl]["xp_required"] for lvl in _LEVEL_KEYS), max)
+)
+# _NEXT_XP[level] = XP needed for level + 1 (None once MAX_LEVEL is reached)
+_NEXT_XP: Tuple[int | None, ...] = tuple(
+    xp_required_for(lvl + 1) for lvl in range(MAX_LEVEL)
+) + (None,)
+# _LEVEL_UP_XP[level] = smallest XP for which level_for_xp() goes above
+# `level` (None at MAX_LEVEL). Lets apply_xp_and_level_up skip the lookup
+# on the common "no level-up" collect with a single compare.
+_LEVEL_UP_XP: Tuple[int | None, ...] = tuple(
+    _LEVEL_XP_CUMMAX[idx] if idx < len(_LEVEL_KEYS) else None
+    for idx in (bisect_right(_LEVEL_KEYS, lvl) for lvl in range(MAX_LEVEL + 1))
+)
+
+
 def level_for_xp(xp: float | int) -> int:
     """Return the level for a given XP value (based on LEVELS thresholds)."""
-    lvl = 0
-    for level in sorted(LEVELS.keys()):
-        if xp >= LEVELS[level]["xp_required"]:
-            lvl = level
-        else:
-            break
-    return lvl
+    idx = bisect_right(_LEVEL_XP_CUMMAX, xp)
+    return _LEVEL_KEYS[idx - 1] if idx else 0
 
 
 def next_threshold(current_level: int) -> int | None:
     """Return XP required for the next level, or None if already maxed."""
+    if 0 <= current_level < len(_NEXT_XP):
+        return _NEXT_XP[current_level]
     if not LEVELS or current_level >= MAX_LEVEL:
         return None
     return xp_required_for(current_level + 1)
@@ -80,19 +105,8 @@ def _grant_resource(session, player_id: int, resource_key: str, amount: float) -
     if not resource_key or amount <= 0:
         return
 
-    from .models import ResourceStock  # local import to avoid circular deps
-
-    row = (
-        session.query(ResourceStock)
-        .filter_by(player_id=player_id, resource=resource_key)
-        .one_or_none()
-    )
-
-    if not row:
-        row = ResourceStock(player_id=player_id, resource=resource_key, qty=0.0)
-        session.add(row)
-
-    row.qty = (row.qty or 0.0) + float(amount)
+    # Single INSERT ... ON CONFLICT(player_id, resource) DO UPDATE
+    add_player_stock(session, player_id, resource_key, float(amount))
 
 
 def _grant_card(session, player_id: int, card_key: str, amount: int = 1) -> None:
@@ -100,8 +114,6 @@ def _grant_card(session, player_id: int, card_key: str, amount: int = 1) -> None
     if not card_key or amount <= 0:
         return
 
-    from .models import PlayerCard  # local import to avoid circular deps
-
     row = (
         session.query(PlayerCard)
         .filter_by(player_id=player_id, card_key=card_key)
@@ -132,16 +144,11 @@ def apply_level_rewards(session, player, new_level: int) -> List[Dict]:
     if not cfg:
         return []
 
-    from .models import ResourceDef, CardDef  # local import to avoid circular deps
-
     rewards = cfg.get("rewards", []) or []
     applied: List[Dict] = []
 
     # Cache defs pour éviter des queries répétées dans une même montée de niveau
-    resource_defs = {
-        r.key: r
-        for r in session.query(ResourceDef).filter_by(enabled=True).all()
-    }
+    # (ResourceDef : cache in-process, voir resource_defs.py)
     card_defs = {
         c.key: c
         for c in session.query(CardDef).filter_by(enabled=True).all()
@@ -179,7 +186,7 @@ def apply_level_rewards(session, player, new_level: int) -> List[Dict]:
             amount = float(r.get("amount", 0))
             _grant_resource(session, player.id, resource_key, amount)
 
-            rd = resource_defs.get(resource_key)
+            rd = get_resource_def(resource_key)
             applied.append(
                 {
                     "type": "resource",
@@ -223,9 +230,26 @@ def apply_xp_and_level_up(
     if gained_xp <= 0:
         return False, player.level or 0, []
 
-    player.xp = (player.xp or 0.0) + float(gained_xp)
+    # XP incrémenté côté SQL (UPDATE ... RETURNING) : pas de read-modify-write,
+    # deux collects concurrents ne peuvent plus perdre un gain d'XP.
+    players = Player.__table__
+    new_xp = session.execute(
+        update(players)
+        .where(players.c.id == player.id)
+        .values(xp=func.coalesce(players.c.xp, 0.0) + float(gained_xp))
+        .returning(players.c.xp)
+    ).scalar_one()
+    # Valeur déjà en DB : on la pose sans marquer l'attribut dirty
+    set_committed_value(player, "xp", float(new_xp))
 
     old_level = player.level or 0
+
+    # Fast path: still below the next level-up threshold -> no recompute
+    if 0 <= old_level < len(_LEVEL_UP_XP):
+        level_up_xp = _LEVEL_UP_XP[old_level]
+        if level_up_xp is None or player.xp < level_up_xp:
+            return False, old_level, []
+
     new_level = level_for_xp(player.xp)
 
     if new_level <= old_level:
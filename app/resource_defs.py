@@ -0,0 +1,104 @@
+# =============================================================================
+# File: app/resource_defs.py
+# Purpose: In-process cache of ResourceDef rows (read-mostly table).
+# Notes:
+# - The table only changes when resources.yml is reseeded, so hot endpoints
+#   (collect / sell / unlock) read from memory instead of issuing a SELECT.
+# - seed._upsert_resources() calls invalidate_resource_defs() after commit.
+# =============================================================================
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.db import SessionLocal
+from app.http_cache import content_etag
+from app.models import ResourceDef
+
+@dataclass(frozen=True, slots=True)
+class ResourceDefSnapshot:
+    """Read-only copy of a ResourceDef row (same attribute names)."""
+
+    id: int
+    key: str
+    label: str
+    icon: Optional[str]
+    unlock_min_level: int
+    base_cooldown: float
+    base_sell_price: int
+    enabled: bool
+    unlock_rules: Optional[Dict[str, Any]]
+    description: Optional[str]
+    unlock_description: Optional[str]
+
+
+_RES_DEF_CACHE: Optional[Dict[str, ResourceDefSnapshot]] = None
+_RES_DEF_LOCK = threading.Lock()
+
+# ETag of the cached defs content (see resource_defs_etag)
+_RES_DEF_ETAG: Optional[str] = None
+
+_COLUMNS = tuple(c.key for c in ResourceDef.__table__.columns)
+
+
+def _snapshot(row: ResourceDef) -> ResourceDefSnapshot:
+    """Copy a ResourceDef row into a detached, attribute-compatible object."""
+    return ResourceDefSnapshot(**{name: getattr(row, name) for name in _COLUMNS})
+
+
+def load_resource_defs() -> Dict[str, ResourceDefSnapshot]:
+    """Return all resource defs keyed by `key` (loaded once, then cached)."""
+    global _RES_DEF_CACHE
+
+    cache = _RES_DEF_CACHE
+    if cache is not None:
+        return cache
+
+    with _RES_DEF_LOCK:
+        if _RES_DEF_CACHE is None:
+            with SessionLocal() as s:
+                rows = s.query(ResourceDef).all()
+                _RES_DEF_CACHE = {r.key: _snapshot(r) for r in rows}
+        return _RES_DEF_CACHE
+
+
+def get_resource_def(key: str, enabled_only: bool = True) -> ResourceDefSnapshot | None:
+    """Return the cached def for `key`, or None if unknown (or disabled)."""
+    if not key:
+        return None
+    rd = load_resource_defs().get(key)
+    if rd is None or (enabled_only and not rd.enabled):
+        return None
+    return rd
+
+
+def list_enabled_resource_defs() -> List[ResourceDefSnapshot]:
+    """Enabled defs ordered by unlock_min_level (as /api/resources lists them)."""
+    return sorted(
+        (rd for rd in load_resource_defs().values() if rd.enabled),
+        key=lambda rd: rd.unlock_min_level,
+    )
+
+
+def resource_defs_etag() -> str:
+    """Content hash of the cached defs (changes only when a reseed changes rows)."""
+    global _RES_DEF_ETAG
+
+    etag = _RES_DEF_ETAG
+    if etag is None:
+        defs = load_resource_defs()
+        etag = content_etag(sorted(
+            tuple(getattr(rd, name) for name in _COLUMNS) for rd in defs.values()
+        ))
+        _RES_DEF_ETAG = etag
+    return etag
+
+
+def invalidate_resource_defs() -> None:
+    """Drop the cache; the next lookup reloads it from the DB."""
+    global _RES_DEF_CACHE, _RES_DEF_ETAG
+
+    with _RES_DEF_LOCK:
+        _RES_DEF_CACHE = None
+        _RES_DEF_ETAG = None
@@ -15,6 +15,7 @@ from .api_cards import bp as cards_bp
 from .api_shop import bp as shop_bp
 from .api_craft import bp as craft_bp
 from .api_lands import bp as lands_bp
+from .payloads import PayloadError
 
 def register_routes(app: Flask) -> None:
     """Enregistre tous les blueprints API sur l'app Flask."""
@@ -28,3 +29,5 @@ def register_routes(app: Flask) -> None:
     app.register_blueprint(craft_bp,     url_prefix="/api")
     app.register_blueprint(lands_bp,     url_prefix="/api")
 
+    # Bodies invalides (payloads.py) -> réponse JSON 400 standard
+    app.register_error_handler(PayloadError, lambda e: e.to_response())
@@ -9,7 +9,7 @@ from typing import Any, Dict, List
 from flask import Blueprint, jsonify, request
 
 from app.craft_defs import CRAFT_DEFS
-from app.db import SessionLocal
+from app.db import db_session
 from app.models import Player, PlayerCard, ResourceDef, PlayerItem, ResourceStock  # adapte si les noms diffèrent
 from app.quests.service import on_item_crafted
 
@@ -214,57 +214,57 @@ def list_craft_recipes():
     """
     craft_location = (request.args.get("location") or "craft_table").strip()
     
-    with SessionLocal() as session:
-        player = _get_current_player(session)
-        if not player:
-            return jsonify({"error": "not_logged_in"}), 401
+    session = db_session()
+    player = _get_current_player(session)
+    if not player:
+        return jsonify({"error": "not_logged_in"}), 401
 
-        table_level = _compute_craft_table_level(session, player)
+    table_level = _compute_craft_table_level(session, player)
 
-        available: List[Dict[str, Any]] = []
+    available: List[Dict[str, Any]] = []
 
-        for item_key, cfg in CRAFT_DEFS.items():
-            recipe = cfg.get("recipe")
-            if not recipe:
-                continue
+    for item_key, cfg in CRAFT_DEFS.items():
+        recipe = cfg.get("recipe")
+        if not recipe:
+            continue
 
-            # Filter by craft_location (craft_table / alchemy_table / kitchen / ...)
-            if (recipe.get("craft_location") or "craft_table") != craft_location:
-                continue
+        # Filter by craft_location (craft_table / alchemy_table / kitchen / ...)
+        if (recipe.get("craft_location") or "craft_table") != craft_location:
+            continue
 
-            # Check conditions (cards, level, table level)
-            if not _is_item_unlocked_for_player(session, player, cfg, table_level):
-                continue
+        # Check conditions (cards, level, table level)
+        if not _is_item_unlocked_for_player(session, player, cfg, table_level):
+            continue
 
-            # Build a lightweight payload for frontend
-            available.append(
-                {
-                    "item_key": cfg.get("key") or item_key,
-                    "label_fr": cfg.get("label_fr"),
-                    "label_en": cfg.get("label_en"),
-                    "icon": cfg.get("icon"),
-                    "type": cfg.get("type"),
-                    "category": cfg.get("category"),
-                    "recipe": {
-                        "craft_location": recipe.get("craft_location"),
-                        "width": recipe.get("width"),
-                        "height": recipe.get("height"),
-                        "pattern": recipe.get("pattern"),
-                        "legend": recipe.get("legend"),
-                        "output_quantity": recipe.get("output_quantity"),
-                        "craft_time_seconds": recipe.get("craft_time_seconds"),
-                        "required_table_level": recipe.get("required_table_level"),
-                    },
-                }
-            )
-        print("CRAFT_DEFS loaded keys:", list(CRAFT_DEFS.keys()))
-        return jsonify(
+        # Build a lightweight payload for frontend
+        available.append(
             {
-                "craft_location": craft_location,
-                "craft_table_level": table_level,
-                "recipes": available,
+                "item_key": cfg.get("key") or item_key,
+                "label_fr": cfg.get("label_fr"),
+                "label_en": cfg.get("label_en"),
+                "icon": cfg.get("icon"),
+                "type": cfg.get("type"),
+                "category": cfg.get("category"),
+                "recipe": {
+                    "craft_location": recipe.get("craft_location"),
+                    "width": recipe.get("width"),
+                    "height": recipe.get("height"),
+                    "pattern": recipe.get("pattern"),
+                    "legend": recipe.get("legend"),
+                    "output_quantity": recipe.get("output_quantity"),
+                    "craft_time_seconds": recipe.get("craft_time_seconds"),
+                    "required_table_level": recipe.get("required_table_level"),
+                },
             }
         )
+    print("CRAFT_DEFS loaded keys:", list(CRAFT_DEFS.keys()))
+    return jsonify(
+        {
+            "craft_location": craft_location,
+            "craft_table_level": table_level,
+            "recipes": available,
+        }
+    )
 
 @bp.post("/craft/perform")
 def perform_craft():
@@ -308,111 +308,111 @@ def perform_craft():
             }
         ), 400
 
-    with SessionLocal() as session:
-        player = _get_current_player(session)
-        if not player:
-            return jsonify({"error": "not_logged_in"}), 401
+    session = db_session()
+    player = _get_current_player(session)
+    if not player:
+        return jsonify({"error": "not_logged_in"}), 401
 
-        # Compute player craft table level
-        table_level = _compute_craft_table_level(session, player)
+    # Compute player craft table level
+    table_level = _compute_craft_table_level(session, player)
 
-        # Check if the item is unlocked for the player
-        if not _is_item_unlocked_for_player(session, player, item_cfg, table_level):
-            return jsonify({"error": "craft_locked"}), 403
+    # Check if the item is unlocked for the player
+    if not _is_item_unlocked_for_player(session, player, item_cfg, table_level):
+        return jsonify({"error": "craft_locked"}), 403
 
-        # Check table level vs recipe requirement
-        required_table_level = int(recipe.get("required_table_level") or 1)
-        if table_level < required_table_level:
-            return jsonify(
+    # Check table level vs recipe requirement
+    required_table_level = int(recipe.get("required_table_level") or 1)
+    if table_level < required_table_level:
+        return jsonify(
+            {
+                "error": "craft_table_too_low",
+                "required_table_level": required_table_level,
+                "player_table_level": table_level,
+            }
+        ), 403
+
+    # Compute required resources
+    required = _compute_required_resources(recipe, times=times)
+    if not required:
+        return jsonify({"error": "invalid_recipe_definition"}), 500
+
+    # Load player resources into a map
+    res_map = _load_player_resources_map(session, player)
+
+    # Check if player has enough resources
+    missing: Dict[str, int] = {}
+    for res_key, needed in required.items():
+        pr = res_map.get(res_key)
+        current = float(pr.qty) if pr else 0.0
+        if current < needed:
+            missing[res_key] = needed - int(current)
+
+    if missing:
+        return (
+            jsonify(
                 {
-                    "error": "craft_table_too_low",
-                    "required_table_level": required_table_level,
-                    "player_table_level": table_level,
+                    "error": "not_enough_resources",
+                    "missing": missing,
                 }
-            ), 403
-
-        # Compute required resources
-        required = _compute_required_resources(recipe, times=times)
-        if not required:
-            return jsonify({"error": "invalid_recipe_definition"}), 500
-
-        # Load player resources into a map
-        res_map = _load_player_resources_map(session, player)
-
-        # Check if player has enough resources
-        missing: Dict[str, int] = {}
-        for res_key, needed in required.items():
-            pr = res_map.get(res_key)
-            current = float(pr.qty) if pr else 0.0
-            if current < needed:
-                missing[res_key] = needed - int(current)
-
-        if missing:
-            return (
-                jsonify(
-                    {
-                        "error": "not_enough_resources",
-                        "missing": missing,
-                    }
-                ),
-                400,
-            )
-
-        # Deduct resources
-        for res_key, needed in required.items():
-            pr = res_map.get(res_key)
-            if not pr:
-                # Should not happen since we checked missing above
-                continue
-            pr.qty = float(pr.qty) - needed
-            if pr.qty < 0:
-                pr.qty = 0.0
-
-
-        # Add crafted item(s) in player_items
-        output_qty = int(recipe.get("output_quantity") or 1) * times
-
-        # Find existing PlayerItem or create a new one
-        pi = (
-            session.query(PlayerItem)
-            .filter(
-                PlayerItem.player_id == player.id,
-                PlayerItem.item_key == item_cfg.get("key"),
-            )
-            .one_or_none()
+            ),
+            400,
+        )
+
+    # Deduct resources
+    for res_key, needed in required.items():
+        pr = res_map.get(res_key)
+        if not pr:
+            # Should not happen since we checked missing above
+            continue
+        pr.qty = float(pr.qty) - needed
+        if pr.qty < 0:
+            pr.qty = 0.0
+
+
+    # Add crafted item(s) in player_items
+    output_qty = int(recipe.get("output_quantity") or 1) * times
+
+    # Find existing PlayerItem or create a new one
+    pi = (
+        session.query(PlayerItem)
+        .filter(
+            PlayerItem.player_id == player.id,
+            PlayerItem.item_key == item_cfg.get("key"),
         )
+        .one_or_none()
+    )
 
-        if pi is None:
-            pi = PlayerItem(
-                player_id=player.id,
-                item_key=item_cfg.get("key"),
-                quantity=output_qty,
-            )
-            session.add(pi)
-        else:
-            pi.quantity = int(pi.quantity) + output_qty
-            
-        # --- NEW: quest progression for craft_item ---
-        on_item_crafted(
-            session=session,
-            player=player,
+    if pi is None:
+        pi = PlayerItem(
+            player_id=player.id,
             item_key=item_cfg.get("key"),
             quantity=output_qty,
         )
+        session.add(pi)
+    else:
+        pi.quantity = int(pi.quantity) + output_qty
+
+    # --- NEW: quest progression for craft_item ---
+    on_item_crafted(
+        session=session,
+        player=player,
+        item_key=item_cfg.get("key"),
+        quantity=output_qty,
+    )
 
-        session.commit()
+    session.commit()
 
-        # Basic response (on retournera mieux plus tard)
-        return jsonify(
-            {
-                "ok": True,
-                "crafted_item": {
-                    "item_key": item_cfg.get("key"),
-                    "label_fr": item_cfg.get("label_fr"),
-                    "label_en": item_cfg.get("label_en"),
-                    "quantity": output_qty,
-                },
-                "craft_location": craft_location,
-                "times": times,
-            }
-        )
\ No newline at end of file
+    # Basic response (on retournera mieux plus tard)
+    return jsonify(
+        {
+            "ok": True,
+            "crafted_item": {
+                "item_key": item_cfg.get("key"),
+                "label_fr": item_cfg.get("label_fr"),
+                "label_en": item_cfg.get("label_en"),
+                "quantity": output_qty,
+            },
+            "craft_location": craft_location,
+            "times": times,
+        }
+    )
\ No newline at end of file
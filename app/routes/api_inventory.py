@@ -1,8 +1,10 @@
 # app/routes/api_players.py
-from flask import Blueprint, jsonify, request
-from app.db import SessionLocal
+from flask import Blueprint, jsonify
+from sqlalchemy import literal, select
+
+from app.db import db_session
 from app.models import Player, ResourceStock
-from app.auth import get_current_player
+from app.auth import current_player_id
 
 bp = Blueprint("indeventory", __name__) 
 
@@ -18,17 +20,27 @@ def _round_qty(q, digits: int = 2) -> float:
 @bp.get("/inventory")
 def get_inventory():
     """Return current player's inventory from cookie."""
-    with SessionLocal() as s:
-        me = get_current_player(s)
-        if not me:
+    pid = current_player_id()
+    if pid is None:
+        return jsonify({"error": "not_authenticated"}), 401
+
+    # (resource, qty) en Core rows : ni Player ni ResourceStock hydratés
+    s = db_session()
+    rows = s.execute(
+        select(ResourceStock.resource, ResourceStock.qty)
+        .where(ResourceStock.player_id == pid)
+        .order_by(ResourceStock.resource.asc())
+    ).all()
+
+    # Aucun stock : on vérifie que le cookie pointe bien sur un joueur
+    if not rows:
+        exists = s.execute(
+            select(literal(1)).select_from(Player).where(Player.id == pid)
+        ).first()
+        if exists is None:
             return jsonify({"error": "not_authenticated"}), 401
-        rows = (
-            s.query(ResourceStock)
-            .filter_by(player_id=me.id)
-            .order_by(ResourceStock.resource.asc())
-            .all()
-        )
-        payload = [
-            {"resource": r.resource, "qty": _round_qty(r.qty)} for r in rows
-        ]
-        return jsonify(payload)
\ No newline at end of file
+
+    payload = [
+        {"resource": resource, "qty": _round_qty(qty)} for resource, qty in rows
+    ]
+    return jsonify(payload)
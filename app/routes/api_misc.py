@@ -1,7 +1,6 @@
 # app/routes/api_players.py
-from flask import Blueprint, jsonify, request
-from app.db import SessionLocal
-from app.models import Player
+import orjson
+from flask import Blueprint, Response
 
 
 bp = Blueprint("misc", __name__) 
@@ -15,7 +14,11 @@ bp = Blueprint("misc", __name__)
 def dev_ui():
     return bp.send_static_file("ui/index.html")
 
+# Réponse constante : sérialisée une seule fois
+_HEALTH_BODY = orjson.dumps({"status": "ok"})
+
+
 @bp.get("/health")
 def health():
     """Simple health endpoint used by tests."""
-    return jsonify({"status": "ok"})
\ No newline at end of file
+    return Response(_HEALTH_BODY, mimetype="application/json")
\ No newline at end of file
@@ -2,20 +2,25 @@
 from __future__ import annotations
 
 from flask import Blueprint, jsonify, request, make_response
+from flask import session as flask_session
 
-from app.db import SessionLocal
+from sqlalchemy import insert, literal, null, select, union_all
+from sqlalchemy.exc import IntegrityError
+
+from app.db import db_session
 from app.models import (
     Player,
     Tile,
     ResourceStock,
-    ResourceDef,
     PlayerCard,
     CardDef,
     PlayerItem, 
     PlayerQuest
 )
-from app.progression import next_threshold
+from app.services.players import player_payload
+from app.resource_defs import list_enabled_resource_defs
 from app.craft_defs import CRAFT_DEFS
+from app.auth import current_player_id, get_current_player
 import datetime as dt
 
 from app.quests.service import assign_daily_quest_if_needed, serialize_quest
@@ -28,29 +33,21 @@ def _round_qty(q, digits: int = 2) -> float:
         q = 0.0
     return round(float(q), digits)
 
-def _player_to_dict(p: Player) -> dict:
-    # Petit helper pour uniformiser les réponses
-    return {
-        "id": p.id,
-        "name": p.name,
-        "coins": p.coins,
-        "diams": p.diams,
-        "level": p.level,
-        "xp": p.xp,
-        "next_xp": getattr(p, "next_xp", None),  # ou via progression
-    }
-    
-def _compute_craft_table_level(session, player: Player) -> int:
+def _compute_craft_table_level(session, player: Player, owned_cards: dict | None = None) -> int:
     """
     Compute the craft table level for a player based on owned cards.
 
     Version simple:
     - level 1 par défaut (table de craft de base)
     - +1 pour chaque upgrade (on pourra affiner plus tard)
+
+    owned_cards: {card_key: qty} déjà chargé par l'appelant (évite 3 COUNT).
     """
     level = 1  # on donne la table de craft de base à tout le monde
 
     def has_card(card_key: str) -> bool:
+        if owned_cards is not None:
+            return card_key in owned_cards
         return (
             session.query(PlayerCard)
             .filter_by(player_id=player.id, card_key=card_key)
@@ -72,7 +69,7 @@ def _compute_craft_table_level(session, player: Player) -> int:
     return level
     
     
-def _ensure_starting_land_card(session, player: Player) -> None:
+def _ensure_starting_land_card(session, player) -> None:
     """Ensure the player owns the starting land card (forest)."""
     # Check if the player already has the card
     existing = (
@@ -89,66 +86,63 @@ def _ensure_starting_land_card(session, player: Player) -> None:
     # No commit here: let the caller decide when to commit
     
     
+# Colonnes des réponses "player" en lecture seule (Core rows, pas d'ORM)
+_PLAYER_COLS = (Player.id, Player.name, Player.level, Player.coins, Player.diams, Player.xp)
+
+
+def _insert_player(session, name: str):
+    """INSERT ... RETURNING : crée le joueur et renvoie sa Row payload en un statement."""
+    return session.execute(
+        insert(Player).values(name=name).returning(*_PLAYER_COLS)
+    ).one()
+
+
+def _create_or_get_player(session, name: str):
+    """
+    Tente l'INSERT directement (players.name est UNIQUE) : pas de SELECT
+    préalable dans le cas courant (nom libre).
+
+    Retourne (row, created). Nom déjà pris -> rollback + SELECT de l'existant.
+    """
+    try:
+        return _insert_player(session, name), True
+    except IntegrityError:
+        session.rollback()
+    row = session.execute(select(*_PLAYER_COLS).where(Player.name == name)).one()
+    return row, False
+
+
+def _set_player_cookie(resp, player_id: int):
+    resp.set_cookie(
+        "player_id",
+        str(player_id),
+        httponly=True,
+        samesite="Lax",
+        max_age=60 * 60 * 24 * 365,
+    )
+    return resp
+
+
 @bp.post("/player")
 def create_player():
-    s = SessionLocal()
+    s = db_session()
     name = (request.get_json() or {}).get("name")
     if not name:
-        s.close()
         return jsonify({"error": "name_required"}), 400
 
-    existing = s.query(Player).filter_by(name=name).first()
-    if existing:
-        p = existing
-        resp = jsonify(
-            {
-                "id": p.id,
-                "name": p.name,
-                "level": p.level,
-                "coins": p.coins,
-                "diams": p.diams,
-                "xp": p.xp,
-                "next_xp": next_threshold(p.level),
-            }
-        )
-        s.close()
-        return resp, 200
-
-    p = Player(name=name)
-    s.add(p)
-    s.commit()
-    resp = jsonify(
-        {
-            "id": p.id,
-            "name": p.name,
-            "level": p.level,
-            "coins": p.coins,
-            "diams": p.diams,
-            "xp": p.xp,
-            "next_xp": next_threshold(p.level),
-        }
-    )
-    s.close()
-    return resp, 200
+    row, created = _create_or_get_player(s, name)
+    if created:
+        s.commit()
+    return jsonify(player_payload(row)), 200
 
 @bp.get("/player/<int:player_id>")
 def get_player(player_id: int):
     """Return a player by id."""
-    with SessionLocal() as s:
-        p = s.get(Player, player_id)
-        if not p:
-            return jsonify({"error": "not_found"}), 404
-        return jsonify(
-            {
-                "id": p.id,
-                "name": p.name,
-                "level": p.level,
-                "coins": p.coins,
-                "diams": p.diams,
-                "xp": p.xp,
-                "next_xp": next_threshold(p.level),
-            }
-        )
+    s = db_session()
+    row = s.execute(select(*_PLAYER_COLS).where(Player.id == player_id)).first()
+    if not row:
+        return jsonify({"error": "not_found"}), 404
+    return jsonify(player_payload(row))
 
 # -----------------------------------------------------------------
 # Auth: register / login / logout / me
@@ -161,39 +155,18 @@ def register():
     if not name:
         return jsonify({"error": "name_required"}), 400
 
-    with SessionLocal() as s:
-        p = s.query(Player).filter_by(name=name).first()
-        if not p:
-            p = Player(name=name)
-            s.add(p)
-            s.commit()
-            s.refresh(p)
+    s = db_session()
+    row, created = _create_or_get_player(s, name)
+    if created:
+        # Nouveau joueur : aucune carte encore, pas de SELECT de vérification
+        s.add(PlayerCard(player_id=row.id, card_key="land_forest", qty=1))
+    else:
+        _ensure_starting_land_card(s, row)
+    s.commit()
 
-        _ensure_starting_land_card(s, p)
-        s.commit()
+    resp = make_response(jsonify(player_payload(row)))
+    return _set_player_cookie(resp, row.id), 200
 
-        resp = make_response(
-            jsonify(
-                {
-                    "id": p.id,
-                    "name": p.name,
-                    "level": p.level,
-                    "coins": p.coins,
-                    "diams": p.diams,
-                    "xp": p.xp,
-                    "next_xp": next_threshold(p.level),
-                }
-            )
-        )
-        resp.set_cookie(
-            "player_id",
-            str(p.id),
-            httponly=True,
-            samesite="Lax",
-            max_age=60 * 60 * 24 * 365,
-        )
-        return resp, 200
-        
 @bp.post("/login")
 def login():
     """Login by id or name and set the 'player_id' cookie."""
@@ -201,254 +174,228 @@ def login():
     pid = data.get("id")
     name = (data.get("name") or "").strip()
 
-    with SessionLocal() as s:
-        p = None
-        if pid:
-            try:
-                p = s.get(Player, int(pid))
-            except Exception:
-                p = None
-        if not p and name:
-            p = s.query(Player).filter_by(name=name).first()
-        if not p:
-            return jsonify({"error": "player_not_found"}), 404
-
-        resp = make_response(
-            jsonify(
-                {
-                    "id": p.id,
-                    "name": p.name,
-                    "level": p.level,
-                    "coins": p.coins,
-                    "diams": p.diams,
-                    "xp": p.xp,
-                    "next_xp": next_threshold(p.level),
-                }
-            )
-        )
-        resp.set_cookie(
-            "player_id",
-            str(p.id),
-            httponly=True,
-            samesite="Lax",
-            max_age=60 * 60 * 24 * 365,
-        )
-        return resp, 200
+    s = db_session()
+    row = None
+    if pid:
+        try:
+            row = s.execute(
+                select(*_PLAYER_COLS).where(Player.id == int(pid))
+            ).first()
+        except Exception:
+            row = None
+    if not row and name:
+        row = s.execute(select(*_PLAYER_COLS).where(Player.name == name)).first()
+    if not row:
+        return jsonify({"error": "player_not_found"}), 404
+
+    resp = make_response(jsonify(player_payload(row)))
+    return _set_player_cookie(resp, row.id), 200
 
 @bp.post("/logout")
 def logout():
     resp = make_response(jsonify({"ok": True}))
     resp.set_cookie("player_id", "", max_age=0)
+    flask_session.pop("admin", None)  # claim admin (app/admin)
     return resp, 200
 
 @bp.get("/me")
 def whoami():
-    with SessionLocal() as s:
-        p = _get_current_player(s)
-        if not p:
-            return jsonify({"error": "not_authenticated"}), 401
-        return jsonify(
-            {
-                "id": p.id,
-                "name": p.name,
-                "level": p.level,
-                "coins": p.coins,
-                "diams": p.diams,
-                "xp": p.xp,
-                "next_xp": next_threshold(p.level),
-            }
-        )     
-        
+    pid = current_player_id()
+    row = None
+    if pid is not None:
+        s = db_session()
+        row = s.execute(select(*_PLAYER_COLS).where(Player.id == pid)).first()
+    if not row:
+        return jsonify({"error": "not_authenticated"}), 401
+    return jsonify(player_payload(row))
+
+def _tiles_and_stocks_stmt(player_id: int):
+    """
+    Tiles and resource stocks of a player in a single statement.
+    Rows are tagged by `kind` ("t" = tile, "s" = stock); tiles come ordered by
+    id, stocks by resource name (same order as the former two queries).
+    """
+    tiles_q = select(
+        literal("t").label("kind"),
+        Tile.id,
+        Tile.player_id,
+        Tile.resource,
+        Tile.locked,
+        Tile.cooldown_until,
+        null().label("qty"),
+    ).where(Tile.player_id == player_id)
+
+    stocks_q = select(
+        literal("s"),
+        null(),
+        ResourceStock.player_id,
+        ResourceStock.resource,
+        null(),
+        null(),
+        ResourceStock.qty,
+    ).where(ResourceStock.player_id == player_id)
+
+    u = union_all(tiles_q, stocks_q).subquery()
+    return select(u).order_by(u.c.kind.desc(), u.c.id, u.c.resource)
+
 @bp.get("/state")
 def get_state():
     """Return full player state, including cards (new format)."""
-    with SessionLocal() as s:   
-        me = _get_current_player(s)
-        if not me:
-            return jsonify({"error": "not_authenticated"}), 401
-
-        # --- NEW: ensure daily quest is assigned for today ---
-        now = dt.datetime.utcnow()
-        assign_daily_quest_if_needed(s, me, now=now)
-        s.commit()
-        # --- NEW: Load active quests ---------------------------------------
-        quests = (
-            s.query(PlayerQuest)
-            .filter(PlayerQuest.player_id == me.id)
-            .filter(PlayerQuest.status.in_(["active", "completed"]))
-            .order_by(PlayerQuest.started_at.desc())
-            .all()
-        )
-        quests_payload = [serialize_quest(q) for q in quests]
-        # -------------------------------------------------------------------
-        # ------------------------------
-        # Tiles
-        # ------------------------------
-        tiles = (
-            s.query(Tile)
-            .filter_by(player_id=me.id)
-            .order_by(Tile.id.asc())
-            .all()
-        )
-        tiles_payload = []
-        for t in tiles:
+    s = db_session()
+    me = get_current_player(s)
+    if not me:
+        return jsonify({"error": "not_authenticated"}), 401
+
+    # --- NEW: ensure daily quest is assigned for today ---
+    now = dt.datetime.utcnow()
+    assign_daily_quest_if_needed(s, me, now=now)
+    s.commit()
+    # --- NEW: Load active quests ---------------------------------------
+    quests = (
+        s.query(PlayerQuest)
+        .filter(PlayerQuest.player_id == me.id)
+        .filter(PlayerQuest.status.in_(["active", "completed"]))
+        .order_by(PlayerQuest.started_at.desc())
+        .all()
+    )
+    quests_payload = [serialize_quest(q) for q in quests]
+    # -------------------------------------------------------------------
+    # ------------------------------
+    # Tiles + resource inventory (one UNION ALL round trip)
+    # ------------------------------
+    tiles_payload = []
+    inventory_payload = []
+    for row in s.execute(_tiles_and_stocks_stmt(me.id)):
+        if row.kind == "t":
             tiles_payload.append({
-                "id": t.id,
-                "playerId": t.player_id,
-                "resource": t.resource,
-                "locked": t.locked,
-                "cooldown_until": (
-                    t.cooldown_until.isoformat() if t.cooldown_until else None
-                ),
+                "id": row.id,
+                "playerId": row.player_id,
+                "resource": row.resource,
+                "locked": row.locked,
+                # datetime brut : orjson l'émet en ISO 8601 (+00:00, cf. json_provider)
+                "cooldown_until": row.cooldown_until,
             })
+        else:
+            inventory_payload.append(
+                {"resource": row.resource, "qty": _round_qty(row.qty)}
+            )
 
-        # ------------------------------
-        # Resource inventory
-        # ------------------------------
-        stocks = (
-            s.query(ResourceStock)
-            .filter_by(player_id=me.id)
-            .order_by(ResourceStock.resource.asc())
-            .all()
-        )
-        inventory_payload = [
-            {"resource": rs.resource, "qty": _round_qty(rs.qty)}
-            for rs in stocks
-        ]
-
-        # ------------------------------
-        # Resource defs
-        # ------------------------------
-        resources_rows = (
-            s.query(ResourceDef)
-            .filter_by(enabled=True)
-            .order_by(ResourceDef.unlock_min_level.asc())
-            .all()
-        )
-        resources_payload = [
-            {
-                "key": r.key,
-                "label": r.label,
-                "icon": r.icon,
-                "unlock_min_level": r.unlock_min_level,
-                "base_cooldown": r.base_cooldown,
-                "base_sell_price": r.base_sell_price,
-                "enabled": r.enabled,
-            }
-            for r in resources_rows
-        ]
-
-        # ------------------------------
-        # Cards (NEW)
-        # ------------------------------
-        # 1) all enabled card defs
-        card_defs = (
-            s.query(CardDef)
-            .filter_by(enabled=True)
-            .order_by(CardDef.key.asc())
-            .all()
+    # ------------------------------
+    # Resource defs (in-process cache, no query)
+    # ------------------------------
+    resources_rows = list_enabled_resource_defs()
+    resources_payload = [
+        {
+            "key": r.key,
+            "label": r.label,
+            "icon": r.icon,
+            "unlock_min_level": r.unlock_min_level,
+            "base_cooldown": r.base_cooldown,
+            "base_sell_price": r.base_sell_price,
+            "enabled": r.enabled,
+        }
+        for r in resources_rows
+    ]
+
+    # ------------------------------
+    # Cards (NEW)
+    # ------------------------------
+    # 1) all enabled card defs (Core rows, no CardDef instances)
+    card_defs = s.execute(
+        select(
+            CardDef.key,
+            CardDef.label,
+            CardDef.description,
+            CardDef.icon,
+            CardDef.categorie,
+            CardDef.rarity,
+            CardDef.type,
+            CardDef.gameplay,
+            CardDef.prices,
+            CardDef.shop,
+            CardDef.buy_rules,
+            CardDef.enabled,
         )
+        .where(CardDef.enabled == True)
+        .order_by(CardDef.key.asc())
+    ).all()
+
+    # 2) owned qty indexed by card_key
+    owned_map = dict(
+        s.execute(
+            select(PlayerCard.card_key, PlayerCard.qty)
+            .where(PlayerCard.player_id == me.id)
+        ).all()
+    )
 
-        # 2) owned qty indexed by card_key
-        owned_rows = (
-            s.query(PlayerCard)
-            .filter_by(player_id=me.id)
-            .all()
-        )
-        owned_map = {pc.card_key: pc.qty for pc in owned_rows}
-
-        cards_payload = []
-        for cd in card_defs:
-            cards_payload.append({
-                "key": cd.key,
-                "label": cd.label,
-                "description": cd.description,
-                "icon": cd.icon,
-
-                "categorie": cd.categorie,
-                "rarity": cd.rarity,
-                "type": cd.type,
-
-                "gameplay": cd.gameplay or {},
-                "prices": cd.prices or [],
-                "shop": cd.shop or {},
-                "buy_rules": cd.buy_rules or {},
-
-                "enabled": cd.enabled,
-                "owned_qty": owned_map.get(cd.key, 0),
-            })
+    cards_payload = [
+        {
+            "key": cd.key,
+            "label": cd.label,
+            "description": cd.description,
+            "icon": cd.icon,
+
+            "categorie": cd.categorie,
+            "rarity": cd.rarity,
+            "type": cd.type,
+
+            "gameplay": cd.gameplay or {},
+            "prices": cd.prices or [],
+            "shop": cd.shop or {},
+            "buy_rules": cd.buy_rules or {},
+
+            "enabled": cd.enabled,
+            "owned_qty": owned_map.get(cd.key, 0),
+        }
+        for cd in card_defs
+    ]
+
+    # ------------------------------
+    # Items craftés (PlayerItem)
+    # ------------------------------
+    item_rows = s.execute(
+        select(PlayerItem.item_key, PlayerItem.quantity)
+        .where(PlayerItem.player_id == me.id)
+        .where(PlayerItem.quantity > 0)  # on n'envoie pas les stacks vides
+        .order_by(PlayerItem.item_key.asc())
+    ).all()
+
+    items_payload = []
+    for item_key, quantity in item_rows:
+        cfg = CRAFT_DEFS.get(item_key, {})  # peut être vide si supprimé du YAML
+
+        items_payload.append({
+            "item_key": item_key,
+            "qty": quantity,
+            "label_fr": cfg.get("label_fr"),
+            "label_en": cfg.get("label_en"),
+            "icon": cfg.get("icon"),
+            "type": cfg.get("type"),
+            "category": cfg.get("category"),
+        })
+
+    # ------------------------------
+    # Info Craft (niveau de table)
+    # ------------------------------
+    craft_table_level = _compute_craft_table_level(s, me, owned_map)
+    craft_payload = {
+        "craft_table_level": craft_table_level,
+    }
 
-        # ------------------------------
-        # Items craftés (PlayerItem)
-        # ------------------------------
-        item_rows = (
-            s.query(PlayerItem)
-            .filter_by(player_id=me.id)
-            .order_by(PlayerItem.item_key.asc())
-            .all()
-        )
+    # ------------------------------
+    # Return final state
+    # ------------------------------
+    return jsonify({
+        "player": player_payload(me),
+        "tiles": tiles_payload,
+        "inventory": inventory_payload,
+        "resources": resources_payload,
 
-        items_payload = []
-        for it in item_rows:
-            if it.quantity <= 0:
-                continue  # on n'envoie pas les stacks vides
-
-            cfg = CRAFT_DEFS.get(it.item_key, {})  # peut être vide si supprimé du YAML
-
-            items_payload.append({
-                "item_key": it.item_key,
-                "qty": it.quantity,
-                "label_fr": cfg.get("label_fr"),
-                "label_en": cfg.get("label_en"),
-                "icon": cfg.get("icon"),
-                "type": cfg.get("type"),
-                "category": cfg.get("category"),
-            })
+        # NEW
+        "cards": cards_payload,
 
-        # ------------------------------
-        # Info Craft (niveau de table)
-        # ------------------------------
-        craft_table_level = _compute_craft_table_level(s, me)
-        craft_payload = {
-            "craft_table_level": craft_table_level,
-        }
+        "items": items_payload,
+        "craft": craft_payload,
 
-        # ------------------------------
-        # Return final state
-        # ------------------------------
-        return jsonify({
-            "player": {
-                "id": me.id,
-                "name": me.name,
-                "level": me.level,
-                "xp": me.xp,
-                "coins": me.coins,
-                "diams": me.diams,
-                "next_xp": next_threshold(me.level),
-            },
-            "tiles": tiles_payload,
-            "inventory": inventory_payload,
-            "resources": resources_payload,
-
-            # NEW
-            "cards": cards_payload,
-            
-            "items": items_payload,
-            "craft": craft_payload,
-            
-            "quests": quests_payload, 
-        }), 200
-
-        
-# -----------------------------------------------------------------
-# Helper: cookie-based auth
-# -----------------------------------------------------------------
-def _get_current_player(session):
-    pid = request.cookies.get("player_id")
-    if not pid:
-        return None
-    try:
-        pid = int(pid)
-    except ValueError:
-        return None
-    return session.get(Player, pid)           
\ No newline at end of file
+        "quests": quests_payload, 
+    }), 200
@@ -6,13 +6,24 @@ import random
 from datetime import datetime, timedelta, timezone
 
 from flask import Blueprint, jsonify, request
+from sqlalchemy import bindparam, insert, literal, or_, select, update
 
-from app.db import SessionLocal
-from app.models import ResourceDef, Tile, Player, ResourceStock, CardDef, PlayerCard
-from app.progression import XP_PER_COLLECT, next_threshold, apply_xp_and_level_up
+from app.db import db_session
+from app.models import Tile, Player, CardDef, PlayerCard
+from app.progression import XP_PER_COLLECT, apply_xp_and_level_up
+from app.services.players import player_payload
+from app.services.stocks import add_player_stock
 from app.unlock_rules import check_unlock_rules
 from app.auth import get_current_player
 from app.lands import get_land_def
+from app.resource_defs import (
+    ResourceDefSnapshot,
+    get_resource_def,
+    list_enabled_resource_defs,
+    resource_defs_etag,
+)
+from app.http_cache import cached_json
+from app.routes.payloads import CollectBody
 
 from app.quests.service import on_resource_collected
 
@@ -21,10 +32,41 @@ bp = Blueprint("resources", __name__)
 # -----------------------------------------------------------------
 # Helpers locaux (évitent les import circulaires)
 # -----------------------------------------------------------------
-def _get_res_def(session, key: str) -> ResourceDef | None:
-  if not key:
-      return None
-  return session.query(ResourceDef).filter_by(key=key, enabled=True).first()
+def _get_res_def(session, key: str) -> ResourceDefSnapshot | None:
+  # Served from the in-process cache (see app/resource_defs.py), no SELECT.
+  return get_resource_def(key)
+
+def _utcnow(_now=datetime.now, _utc=timezone.utc) -> datetime:
+    """
+    UTC naïf, comme stocké en SQLite : se compare directement à
+    cooldown_until (pas de tz à rajouter par tile) et orjson l'émet
+    en ISO 8601 "+00:00" (OPT_NAIVE_UTC), comme un datetime aware.
+
+    datetime.now / timezone.utc liés en defaults (LOAD_FAST) : appelé à
+    chaque collect.
+    """
+    return _now(_utc).replace(tzinfo=None)
+
+
+def _claim_tile(session, tile_id: int, now: datetime, next_cd: datetime) -> bool:
+    """
+    Set the tile cooldown in one conditional UPDATE.
+
+    Returns False when the tile is locked or still on cooldown (e.g. a
+    concurrent collect won the race), True otherwise.
+    """
+    tiles = Tile.__table__
+    res = session.execute(
+        update(tiles)
+        .where(
+            tiles.c.id == tile_id,
+            tiles.c.locked == False,  # noqa: E712
+            or_(tiles.c.cooldown_until.is_(None), tiles.c.cooldown_until <= now),
+        )
+        .values(cooldown_until=next_cd)
+    )
+    return res.rowcount == 1
+
 
 def _player_has_land(session, player_id: int, land_key: str) -> bool:
     """
@@ -35,12 +77,12 @@ def _player_has_land(session, player_id: int, land_key: str) -> bool:
       land 'beach'  -> card_key 'land_beach'
     """
     card_key = f"land_{land_key}"
-    row = (
-        session.query(PlayerCard)
-        .filter_by(player_id=player_id, card_key=card_key)
-        .first()
-    )
-    return bool(row and row.qty > 0)
+    qty = session.execute(
+        select(PlayerCard.qty)
+        .where(PlayerCard.player_id == player_id, PlayerCard.card_key == card_key)
+        .limit(1)
+    ).scalar()
+    return bool(qty and qty > 0)
 
 def _roll_land_loot(tool_cfg: dict) -> dict[str, float]:
     """
@@ -84,83 +126,127 @@ def _roll_land_loot(tool_cfg: dict) -> dict[str, float]:
 # -----------------------------------------------------------------
 def _count_cards(session, player_id: int, card_type: str, target_resource: str | None = None) -> int:
     """Return total quantity of cards of a given type (optionally tied to a resource)."""
-    q = (
-        session.query(PlayerCard, CardDef)
+    stmt = (
+        select(PlayerCard.qty)
         .join(CardDef, CardDef.key == PlayerCard.card_key)
-        .filter(
+        .where(
             PlayerCard.player_id == player_id,
             CardDef.type == card_type,
         )
     )
     if target_resource is not None:
-        q = q.filter(CardDef.target_resource == target_resource)
+        stmt = stmt.where(CardDef.target_resource == target_resource)
 
-    rows = q.all()
-    return sum(pc.qty for pc, cd in rows)
+    return sum(session.scalars(stmt))
 
 
 def _has_unlock_resource_card(session, player_id: int, resource_key: str) -> bool:
     """Return True if player owns at least one unlock_resource card for this resource."""
-    q = (
-        session.query(PlayerCard, CardDef)
+    stmt = (
+        select(literal(1))
+        .select_from(PlayerCard)
         .join(CardDef, CardDef.key == PlayerCard.card_key)
-        .filter(
+        .where(
             PlayerCard.player_id == player_id,
+            PlayerCard.qty > 0,
             CardDef.type == "unlock_resource",
             CardDef.target_resource == resource_key,
         )
+        .limit(1)
     )
-    rows = q.all()
-    return any(pc.qty > 0 for pc, cd in rows)
-
-def _get_xp_boost_cards(session, player_id: int):
+    return session.execute(stmt).first() is not None
+
+# Types de cartes lus par les calculs de collect (xp / cooldown / loot)
+_BOOST_CARD_TYPES = ("xp_boost", "reduce_cooldown", "land_loot_boost", "resource_boost")
+
+# Requêtes des chemins chauds construites une fois à l'import (bind params),
+# comme services/stocks.py : pas de reconstruction de l'expression par requête.
+_Q_BOOST_CARDS = (
+    select(CardDef.type, PlayerCard.qty, CardDef.gameplay)
+    .join(CardDef, CardDef.key == PlayerCard.card_key)
+    .where(
+        PlayerCard.player_id == bindparam("player_id"),
+        CardDef.type.in_(_BOOST_CARD_TYPES),
+    )
+)
+
+# Tile (colonnes utiles) + son Player, pour collect en mode tile
+_Q_COLLECT_TILE = (
+    select(Tile.id, Tile.player_id, Tile.resource, Tile.locked, Tile.cooldown_until, Player)
+    .join(Player, Player.id == Tile.player_id)
+    .where(Tile.id == bindparam("tile_id"))
+)
+
+# Tiles d'un joueur pour /player/<id>/tiles
+_Q_PLAYER_TILES = select(
+    Tile.id,
+    Tile.player_id.label("playerId"),
+    Tile.resource,
+    Tile.locked,
+    # datetime brut : orjson l'émet en ISO 8601 (+00:00, cf. json_provider)
+    Tile.cooldown_until,
+).where(Tile.player_id == bindparam("player_id"))
+
+
+def _load_boost_cards(session, player_id: int) -> list:
     """
-    Return list of XP boost configs:
-    [
-      {"qty":1, "type":"addition", "amount":0.10},
-      ...
-    ]
+    Toutes les cartes boost du joueur en un seul SELECT : [(type, qty, gameplay)].
+
+    A passer en `cards=` aux helpers _compute_* pour qu'un collect ne refasse
+    pas une requête par boost (et par ressource en mode land).
     """
-    rows = (
-        session.query(PlayerCard, CardDef)
+    return session.execute(_Q_BOOST_CARDS, {"player_id": player_id}).all()
+
+
+def _boost_rows(session, player_id: int, card_type: str, cards: list | None):
+    """[(qty, gameplay)] des cartes `card_type` (préchargées ou requêtées)."""
+    if cards is not None:
+        return [(qty, gameplay) for ctype, qty, gameplay in cards if ctype == card_type]
+    return (
+        session.query(PlayerCard.qty, CardDef.gameplay)
         .join(CardDef, CardDef.key == PlayerCard.card_key)
         .filter(
             PlayerCard.player_id == player_id,
-            CardDef.type == "xp_boost"
+            CardDef.type == card_type,
         )
         .all()
     )
 
+
+def _get_xp_boost_cards(session, player_id: int, cards: list | None = None):
+    """
+    Return list of XP boost configs:
+    [
+      {"qty":1, "type":"addition", "amount":0.10},
+      ...
+    ]
+    """
+    rows = _boost_rows(session, player_id, "xp_boost", cards)
+
     boosts = []
-    for pc, cd in rows:
-        gp = cd.gameplay or {}
+    for qty, gameplay in rows:
+        gp = gameplay or {}
         xp_cfg = gp.get("xp")
         if not xp_cfg:
             continue
 
         boosts.append({
-            "qty": pc.qty,
+            "qty": qty,
             "type": xp_cfg.get("type", "addition"),
             "amount": float(xp_cfg.get("amount", 0.0)),
         })
 
     return boosts
 
-def _get_cooldown_boost_cards(session, player_id: int, resource_key: str):
+def _get_cooldown_boost_cards(session, player_id: int, resource_key: str, cards: list | None = None):
     """
     Returns cooldown boosts for this resource OR global ones.
     """
-    rows = (
-        session.query(PlayerCard, CardDef)
-        .join(CardDef, CardDef.key == PlayerCard.card_key)
-        .filter(PlayerCard.player_id == player_id)
-        .filter(CardDef.type == "reduce_cooldown")
-        .all()
-    )
+    rows = _boost_rows(session, player_id, "reduce_cooldown", cards)
 
     boosts = []
-    for pc, cd in rows:
-        gp = cd.gameplay or {}
+    for qty, gameplay in rows:
+        gp = gameplay or {}
 
         # Resource-specific?
         target = gp.get("target_resource")
@@ -172,7 +258,7 @@ def _get_cooldown_boost_cards(session, player_id: int, resource_key: str):
             continue
 
         boosts.append({
-            "qty": pc.qty,
+            "qty": qty,
             "type": cd_cfg.get("type", "reduction"),
             "amount": float(cd_cfg.get("amount", 0.0)),
         })
@@ -181,7 +267,7 @@ def _get_cooldown_boost_cards(session, player_id: int, resource_key: str):
 
 
 
-def _compute_collect_amount(session, player_id: int, resource_key: str) -> float:
+def _compute_collect_amount(session, player_id: int, resource_key: str, cards: list | None = None) -> float:
     """
     Compute how many units of a resource are collected per click.
 
@@ -192,7 +278,7 @@ def _compute_collect_amount(session, player_id: int, resource_key: str) -> float
 
     base = 1.0
 
-    boosts = _get_resource_boost_cards(session, player_id, resource_key)
+    boosts = _get_resource_boost_cards(session, player_id, resource_key, cards)
 
     value = base
 
@@ -212,13 +298,13 @@ def _compute_collect_amount(session, player_id: int, resource_key: str) -> float
     return round(value, 4)
 
 
-def _compute_xp_gain(session, player_id: int, base_xp: int) -> float:
+def _compute_xp_gain(session, player_id: int, base_xp: int, cards: list | None = None) -> float:
     """
     Compute XP gain per collect using YAML boost configs.
     """
     xp = base_xp
 
-    boosts = _get_xp_boost_cards(session, player_id)
+    boosts = _get_xp_boost_cards(session, player_id, cards)
 
     for b in boosts:
         qty = b["qty"]
@@ -235,13 +321,15 @@ def _compute_xp_gain(session, player_id: int, base_xp: int) -> float:
 
     return round(xp, 4)
 
-def _compute_cooldown(session, player_id: int, resource_key: str, base_cooldown: float) -> float:
+def _compute_cooldown(
+    session, player_id: int, resource_key: str, base_cooldown: float, cards: list | None = None
+) -> float:
     """
     Compute cooldown using YAML-based boost configs.
     """
     cooldown = base_cooldown
 
-    boosts = _get_cooldown_boost_cards(session, player_id, resource_key)
+    boosts = _get_cooldown_boost_cards(session, player_id, resource_key, cards)
 
     for b in boosts:
         qty = b["qty"]
@@ -258,7 +346,9 @@ def _compute_cooldown(session, player_id: int, resource_key: str, base_cooldown:
 
     return round(cooldown, 4)
 
-def _compute_land_loot_multiplier(session, player_id: int, land_key: str, tool_key: str) -> float:
+def _compute_land_loot_multiplier(
+    session, player_id: int, land_key: str, tool_key: str, cards: list | None = None
+) -> float:
     """
     Compute a global loot multiplier for land collection.
 
@@ -270,7 +360,7 @@ def _compute_land_loot_multiplier(session, player_id: int, land_key: str, tool_k
     """
     value = 1.0
 
-    boosts = _get_land_loot_boost_cards(session, player_id, land_key, tool_key)
+    boosts = _get_land_loot_boost_cards(session, player_id, land_key, tool_key, cards)
 
     for b in boosts:
         qty = b["qty"]
@@ -288,7 +378,7 @@ def _compute_land_loot_multiplier(session, player_id: int, land_key: str, tool_k
     return round(value, 4)
 
 
-def _get_land_loot_boost_cards(session, player_id: int, land_key: str, tool_key: str):
+def _get_land_loot_boost_cards(session, player_id: int, land_key: str, tool_key: str, cards: list | None = None):
     """
     Return list of land loot boosts for this player, filtered by land/tool.
 
@@ -301,19 +391,11 @@ def _get_land_loot_boost_cards(session, player_id: int, land_key: str, tool_key:
           type: "addition" | "multiplier"
           amount: 0.20
     """
-    rows = (
-        session.query(PlayerCard, CardDef)
-        .join(CardDef, CardDef.key == PlayerCard.card_key)
-        .filter(
-            PlayerCard.player_id == player_id,
-            CardDef.type == "land_loot_boost",
-        )
-        .all()
-    )
+    rows = _boost_rows(session, player_id, "land_loot_boost", cards)
 
     boosts = []
-    for pc, cd in rows:
-        gp = cd.gameplay or {}
+    for qty, gameplay in rows:
+        gp = gameplay or {}
 
         # Optional filters: land + tool
         target_land = gp.get("target_land")
@@ -329,7 +411,7 @@ def _get_land_loot_boost_cards(session, player_id: int, land_key: str, tool_key:
             continue
 
         boosts.append({
-            "qty": pc.qty,
+            "qty": qty,
             "type": loot_cfg.get("type", "addition"),
             "amount": float(loot_cfg.get("amount", 0.0)),
         })
@@ -337,7 +419,7 @@ def _get_land_loot_boost_cards(session, player_id: int, land_key: str, tool_key:
     return boosts
 
 
-def _get_resource_boost_cards(session, player_id: int, resource_key: str):
+def _get_resource_boost_cards(session, player_id: int, resource_key: str, cards: list | None = None):
     """
     Return a list of (boost_type, amount) taken from CardDef.gameplay.boost.
     
@@ -345,21 +427,14 @@ def _get_resource_boost_cards(session, player_id: int, resource_key: str):
       - type = "resource_boost"
       - target_resource = resource_key
     """
-    rows = (
-        session.query(PlayerCard, CardDef)
-        .join(CardDef, CardDef.key == PlayerCard.card_key)
-        .filter(
-            PlayerCard.player_id == player_id,
-            CardDef.type == "resource_boost",
-        )
-        .filter(CardDef.gameplay != None)
-        .all()
-    )
+    rows = _boost_rows(session, player_id, "resource_boost", cards)
 
     boosts = []
-    for pc, cd in rows:
-        # we expect cd.gameplay = {"target_resource": "...", "boost": {...}}
-        gp = cd.gameplay or {}
+    for qty, gameplay in rows:
+        if gameplay is None:
+            continue
+        # we expect gameplay = {"target_resource": "...", "boost": {...}}
+        gp = gameplay or {}
         if gp.get("target_resource") != resource_key:
             continue
 
@@ -368,7 +443,7 @@ def _get_resource_boost_cards(session, player_id: int, resource_key: str):
             continue
 
         boosts.append({
-            "qty": pc.qty,
+            "qty": qty,
             "type": boost_cfg.get("type", "addition"),
             "amount": float(boost_cfg.get("amount", 0.0)),
         })
@@ -380,17 +455,25 @@ def _get_resource_boost_cards(session, player_id: int, resource_key: str):
 # Resources listing (for UI + tests)
 # -----------------------------------------------------------------
 
+# (etag, payload) du dernier /resources construit
+_RESOURCES_PAYLOAD: tuple[str, list] | None = None
+
+
 @bp.get("/resources")
 def list_resources():
-    """Liste les définitions de ressources (pour UI + tests)."""
-    with SessionLocal() as s:
-        rows = (
-            s.query(ResourceDef)
-            .filter_by(enabled=True)
-            .order_by(ResourceDef.unlock_min_level.asc())
-            .all()
-        )
-        return jsonify([
+    """Liste les définitions de ressources (pour UI + tests).
+
+    ETag = hash des defs en cache : 304 tant qu'aucun reseed ne les modifie.
+    """
+    etag = resource_defs_etag()
+
+    def build():
+        # Liste construite une fois par version des defs, réutilisée ensuite
+        global _RESOURCES_PAYLOAD
+        cached = _RESOURCES_PAYLOAD
+        if cached is not None and cached[0] == etag:
+            return cached[1]
+        payload = [
             {
                 "key": r.key,
                 "label": r.label,
@@ -399,343 +482,317 @@ def list_resources():
                 "base_sell_price": r.base_sell_price,
                 "enabled": r.enabled,
             }
-            for r in rows
-        ])
-        
+            for r in list_enabled_resource_defs()
+        ]
+        _RESOURCES_PAYLOAD = (etag, payload)
+        return payload
+
+    return cached_json(etag, build)
+
 @bp.post("/collect")
 def collect():
-    data = request.get_json(silent=True) or {}
+    body = CollectBody.from_json(request.get_json(silent=True))
 
     # --------- 1) Nouveau mode: collect sur un land (beach, forest, ...) ----------
-    land_key = (data.get("land") or "").strip()
+    land_key = body.land
     if land_key:
-        slot = data.get("slot")
-        if slot is None:
-            return jsonify({"error": "slot_required"}), 400
-
-        try:
-            slot = int(slot)
-        except ValueError:
-            return jsonify({"error": "slot_invalid"}), 400
-
-        with SessionLocal() as s:
-            # Joueur via cookie
-            p = get_current_player(s)
-            if not p:
-                return jsonify({"error": "player_required"}), 401
-
-            # Vérifier la carte de land
-            if not _player_has_land(s, p.id, land_key):
-                return jsonify({"error": "land_locked"}), 403
-
-            # Définition du land
-            land_def = get_land_def(land_key)
-            if not land_def:
-                return jsonify({"error": "land_unknown"}), 400
-
-            slots = int(land_def.get("slots", 0) or 0)
-            if slots <= 0:
-                return jsonify({"error": "land_has_no_slots"}), 400
-            if slot < 0 or slot >= slots:
-                return jsonify({"error": "slot_out_of_range", "max": slots}), 400
-
-            # Pour l'instant: on utilise toujours les mains
-            tools_cfg = land_def.get("tools") or {}
-            tool_key = "hands"
-            tool_cfg = tools_cfg.get(tool_key)
-            if not tool_cfg:
-                return jsonify({"error": "tool_not_allowed", "tool": tool_key}), 400
-
-            # Calcul du loot brut (sans boosts)
-            raw_loot = _roll_land_loot(tool_cfg)  # {resource: base_qty}
-            
-            # Global land loot multiplier (cards "land_loot_boost")
-            land_loot_mult = _compute_land_loot_multiplier(s, p.id, land_key, tool_key)
-
-            # Temps actuel (pour XP et cooldown client-side)
-            now = datetime.now(timezone.utc)
-
-            # XP (one collect action = base XP_PER_COLLECT, with boost cards)
-            gained_xp = _compute_xp_gain(s, p.id, XP_PER_COLLECT)
-            level_up, new_level, level_rewards = apply_xp_and_level_up(s, p, gained_xp)
-
-            # Appliquer les boosts de ressource + maj inventaire
-            loot_payload = []
-            for res_key, base_amount in raw_loot.items():
-                # quantité boostée par les cartes "resource_boost"
-                per_unit = _compute_collect_amount(s, p.id, res_key)
-                amount = base_amount * per_unit * land_loot_mult
-
-                rs = (
-                    s.query(ResourceStock)
-                    .filter_by(player_id=p.id, resource=res_key)
-                    .first()
-                )
-                if not rs:
-                    rs = ResourceStock(
-                        player_id=p.id,
-                        resource=res_key,
-                        qty=0.0,
-                    )
-                    s.add(rs)
-
-                new_qty = (rs.qty or 0.0) + amount
-                rs.qty = round(new_qty, 2)
-
-                loot_payload.append(
-                    {
-                        "resource": res_key,
-                        "base_amount": base_amount,
-                        "final_amount": round(amount, 2),
-                    }
-                )
-                
-                # --- NEW: quest progression for collect_resource (land mode) ---
-                # base_amount is the pre-boost amount, which we want for quests.
-                on_resource_collected(
-                    session=s,
-                    player=p,
-                    resource_key=res_key,
-                    base_amount=int(base_amount),
-                )
-                # ----------------------------------------------------------------
-
-            # Cooldown "virtuel" pour le client (pour l'instant pas stocké par slot)
-            # On prend la première resource de base_loot comme référence
-            base_res = None
-            base_loot_list = (tool_cfg.get("base_loot") or [])
-            if base_loot_list:
-                base_res = base_loot_list[0].get("resource")
-            base_cd = 10
-            if base_res:
-                rd = _get_res_def(s, base_res)
-                if rd and rd.base_cooldown is not None:
-                    base_cd = rd.base_cooldown
-
-            effective_cd = _compute_cooldown(s, p.id, base_res or "", base_cd)
-            next_cd = now + timedelta(seconds=effective_cd)
-
-            s.commit()
-            s.refresh(p)
-
-            return jsonify(
+        slot = body.slot
+
+        s = db_session()
+        # Joueur via cookie
+        p = get_current_player(s)
+        if not p:
+            return jsonify({"error": "player_required"}), 401
+
+        # Vérifier la carte de land
+        if not _player_has_land(s, p.id, land_key):
+            return jsonify({"error": "land_locked"}), 403
+
+        # Définition du land
+        land_def = get_land_def(land_key)
+        if not land_def:
+            return jsonify({"error": "land_unknown"}), 400
+
+        slots = int(land_def.get("slots", 0) or 0)
+        if slots <= 0:
+            return jsonify({"error": "land_has_no_slots"}), 400
+        if slot < 0 or slot >= slots:
+            return jsonify({"error": "slot_out_of_range", "max": slots}), 400
+
+        # Pour l'instant: on utilise toujours les mains
+        tools_cfg = land_def.get("tools") or {}
+        tool_key = "hands"
+        tool_cfg = tools_cfg.get(tool_key)
+        if not tool_cfg:
+            return jsonify({"error": "tool_not_allowed", "tool": tool_key}), 400
+
+        # Calcul du loot brut (sans boosts)
+        raw_loot = _roll_land_loot(tool_cfg)  # {resource: base_qty}
+
+        # Cartes boost du joueur : un seul SELECT pour tout le collect
+        boost_cards = _load_boost_cards(s, p.id)
+
+        # Global land loot multiplier (cards "land_loot_boost")
+        land_loot_mult = _compute_land_loot_multiplier(s, p.id, land_key, tool_key, boost_cards)
+
+        # Temps actuel (pour XP et cooldown client-side)
+        now = _utcnow()
+
+        # XP (one collect action = base XP_PER_COLLECT, with boost cards)
+        gained_xp = _compute_xp_gain(s, p.id, XP_PER_COLLECT, boost_cards)
+        level_up, new_level, level_rewards = apply_xp_and_level_up(s, p, gained_xp)
+
+        # Appliquer les boosts de ressource + maj inventaire
+        loot_payload = []
+        for res_key, base_amount in raw_loot.items():
+            # quantité boostée par les cartes "resource_boost"
+            per_unit = _compute_collect_amount(s, p.id, res_key, boost_cards)
+            amount = base_amount * per_unit * land_loot_mult
+
+            add_player_stock(s, p.id, res_key, amount)
+
+            loot_payload.append(
                 {
-                    "ok": True,
-                    "mode": "land",
-                    "land": land_key,
-                    "slot": slot,
-                    "loot": loot_payload,
-                    "next": next_cd.isoformat(),
-                    "player": {
-                        "id": p.id,
-                        "name": p.name,
-                        "xp": p.xp,
-                        "level": p.level,
-                        "next_xp": next_threshold(p.level),
-                        "coins": p.coins,
-                        "diams": p.diams,
-                    },
-                    "level_up": level_up,
-                    "level_rewards": level_rewards,
+                    "resource": res_key,
+                    "base_amount": base_amount,
+                    "final_amount": round(amount, 2),
                 }
-            ), 200
-
-    # --------- 2) Mode existant: collect sur une Tile ----------
-    tile_id = data.get("tileId")
-    if not tile_id:
-        return jsonify({"error": "tileId_required"}), 400
-
-    with SessionLocal() as s:
-        t = s.get(Tile, tile_id)
-        if not t:
-            return jsonify({"error": "tile_missing"}), 400
-        if t.locked:
-            return jsonify({"error": "locked"}), 400
-
-        now = datetime.now(timezone.utc)
-        cd = t.cooldown_until
-        if cd is not None and cd.tzinfo is None:
-            cd = cd.replace(tzinfo=timezone.utc)
-
-        if cd and cd > now:
-            return (
-                jsonify(
-                    {"error": "on_cooldown", "until": cd.isoformat()}
-                ),
-                409,
             )
 
-        rd = _get_res_def(s, t.resource)
-        base_cd = rd.base_cooldown if rd else 10
-
-        # Apply cooldown reduction cards (resource-specific + global)
-        effective_cd = _compute_cooldown(s, t.player_id, t.resource, base_cd)
-        next_cd = now + timedelta(seconds=effective_cd)
-        t.cooldown_until = next_cd
-
-        level_up = False
-        level_rewards = []
-        p = s.get(Player, t.player_id)
-        if p:
-            gained_xp = _compute_xp_gain(s, p.id, XP_PER_COLLECT)
-            level_up, new_level, level_rewards = apply_xp_and_level_up(s, p, gained_xp)
-
-
-
-        if t.resource:
-            rs = (
-                s.query(ResourceStock)
-                .filter_by(
-                    player_id=t.player_id, resource=t.resource
-                )
-                .first()
+            # --- NEW: quest progression for collect_resource (land mode) ---
+            # base_amount is the pre-boost amount, which we want for quests.
+            on_resource_collected(
+                session=s,
+                player=p,
+                resource_key=res_key,
+                base_amount=int(base_amount),
+                now=now,  # quests stockent de l'UTC naïf
             )
-            if not rs:
-                rs = ResourceStock(
-                    player_id=t.player_id,
-                    resource=t.resource,
-                    qty=0.0,  # we use float now
-                )
-                s.add(rs)
-
-            # Apply resource_boost cards
-            amount = _compute_collect_amount(s, t.player_id, t.resource)
-            new_qty = (rs.qty or 0.0) + amount
-            rs.qty = round(new_qty, 2)
-            
-            # --- NEW: quest progression for collect_resource (tile mode) ---
-            # One tile collect = base_amount 1 for quest purposes.
-            if p:
-                on_resource_collected(
-                    session=s,
-                    player=p,
-                    resource_key=t.resource,
-                    base_amount=1,
-                )
             # ----------------------------------------------------------------
 
+        # Cooldown "virtuel" pour le client (pour l'instant pas stocké par slot)
+        # On prend la première resource de base_loot comme référence
+        base_res = None
+        base_loot_list = (tool_cfg.get("base_loot") or [])
+        if base_loot_list:
+            base_res = base_loot_list[0].get("resource")
+        base_cd = 10
+        if base_res:
+            rd = _get_res_def(s, base_res)
+            if rd and rd.base_cooldown is not None:
+                base_cd = rd.base_cooldown
+
+        effective_cd = _compute_cooldown(s, p.id, base_res or "", base_cd, boost_cards)
+        next_cd = now + timedelta(seconds=effective_cd)
+
         s.commit()
+
         return jsonify(
             {
                 "ok": True,
-                "next": next_cd.isoformat(),
-                "player": {
-                    "id": p.id,
-                    "name": p.name,
-                    "xp": p.xp,
-                    "level": p.level,
-                    "next_xp": next_threshold(p.level),
-                    "coins": p.coins,
-                    "diams": p.diams,
-                },
+                "mode": "land",
+                "land": land_key,
+                "slot": slot,
+                "loot": loot_payload,
+                "next": next_cd,
+                "player": player_payload(p),
                 "level_up": level_up,
+                "level_rewards": level_rewards,
             }
+        ), 200
+
+    # --------- 2) Mode existant: collect sur une Tile ----------
+    tile_id = body.tile_id
+
+    s = db_session()
+    # Tile (colonnes utiles) + son Player en un seul SELECT ... JOIN
+    row = s.execute(_Q_COLLECT_TILE, {"tile_id": tile_id}).first()
+    if not row:
+        return jsonify({"error": "tile_missing"}), 400
+    t, p = row, row.Player
+    if t.locked:
+        return jsonify({"error": "locked"}), 400
+
+    now = _utcnow()
+    cd = t.cooldown_until
+    if cd and cd > now:
+        return (
+            jsonify(
+                {"error": "on_cooldown", "until": cd}
+            ),
+            409,
+        )
+
+    rd = _get_res_def(s, t.resource)
+    base_cd = rd.base_cooldown if rd else 10
+
+    # Cartes boost du joueur : un seul SELECT pour cooldown / xp / quantité
+    boost_cards = _load_boost_cards(s, t.player_id)
+
+    # Apply cooldown reduction cards (resource-specific + global)
+    effective_cd = _compute_cooldown(s, t.player_id, t.resource, base_cd, boost_cards)
+    next_cd = now + timedelta(seconds=effective_cd)
+
+    # Claim the tile atomically: only succeeds if nobody collected it
+    # since we read it (no read-modify-write on cooldown_until).
+    if not _claim_tile(s, t.id, now, next_cd):
+        return jsonify({"error": "on_cooldown"}), 409
+
+    gained_xp = _compute_xp_gain(s, p.id, XP_PER_COLLECT, boost_cards)
+    level_up, new_level, level_rewards = apply_xp_and_level_up(s, p, gained_xp)
+
+    if t.resource:
+        # Apply resource_boost cards
+        amount = _compute_collect_amount(s, t.player_id, t.resource, boost_cards)
+        add_player_stock(s, t.player_id, t.resource, amount)
+
+        # --- NEW: quest progression for collect_resource (tile mode) ---
+        # One tile collect = base_amount 1 for quest purposes.
+        on_resource_collected(
+            session=s,
+            player=p,
+            resource_key=t.resource,
+            base_amount=1,
+            now=now,  # quests stockent de l'UTC naïf
         )
-     
-        
+        # ----------------------------------------------------------------
+
+    s.commit()
+    return jsonify(
+        {
+            "ok": True,
+            "next": next_cd,
+            "player": player_payload(p),
+            "level_up": level_up,
+        }
+    )
+
+
+def _unlock_denied(s, p: Player, resource: str):
+    """Return an error (payload, status) if `p` may not unlock `resource`, else None."""
+    rd = _get_res_def(s, resource)
+    if not rd:
+        return {"error": "resource_unknown_or_disabled"}, 400
+
+    # Check unlock conditions unless player owns an unlock_resource card
+    if _has_unlock_resource_card(s, p.id, resource):
+        return None  # player has a card, we bypass normal conditions
+
+    # Minimal level check
+    if p.level < rd.unlock_min_level:
+        return {
+            "error": "level_too_low",
+            "required": rd.unlock_min_level,
+        }, 403
+
+    # Advanced unlock rules (coins, other conditions...)
+    ok, details = check_unlock_rules(p, rd.unlock_rules)
+    if not ok:
+        payload = {"error": details.get("reason", "unlock_conditions_not_met")}
+        payload.update(details)
+        return payload, 403
+
+    return None
+
+
 @bp.post("/tiles/unlock")
 def unlock_tile():
     """
     Unlock a tile for the current player or explicit playerId.
 
     Body: {"resource":"wood", "playerId": 1 (optionnel)}
+      -> {"id": 12}
+    Batch: {"resources":["wood","stone"], "playerId": 1 (optionnel)}
+      -> {"ids": [12, 13]}  (tout ou rien : un seul INSERT + un seul commit)
     """
     data = request.get_json(silent=True) or {}
 
-    resource = (data.get("resource") or "").strip().lower()
-    if not resource:
+    batch = isinstance(data.get("resources"), list)
+    if batch:
+        resources = [
+            r.strip().lower() for r in data["resources"] if isinstance(r, str)
+        ]
+        resources = [r for r in resources if r]
+    else:
+        resource = data.get("resource")
+        resource = resource.strip().lower() if isinstance(resource, str) else ""
+        resources = [resource] if resource else []
+
+    if not resources:
         return jsonify({"error": "resource_required"}), 400
 
     # playerId peut être absent → fallback cookie
     player_id = data.get("playerId")
 
-    with SessionLocal() as s:
-        # 1) Résoudre le player
-        if player_id is not None:
-            p = s.get(Player, int(player_id))
-            if not p:
-                return jsonify({"error": "player_not_found"}), 404
-        else:
-            me = get_current_player(s)
-            if not me:
-                return jsonify({"error": "player_required"}), 400
-            p = me
-
-        # 2) ResourceDef
-        rd = _get_res_def(s, resource)
-        if not rd:
-            return jsonify({"error": "resource_unknown_or_disabled"}), 400
-
-        # 3) Check unlock conditions unless player owns an unlock_resource card
-        has_unlock_card = _has_unlock_resource_card(s, p.id, resource)
-
-        if not has_unlock_card:
-            # Minimal level check
-            if p.level < rd.unlock_min_level:
-                return jsonify({
-                    "error": "level_too_low",
-                    "required": rd.unlock_min_level,
-                }), 403
-
-            # Advanced unlock rules (coins, other conditions...)
-            ok, details = check_unlock_rules(p, rd.unlock_rules)
-            if not ok:
-                payload = {"error": details.get("reason", "unlock_conditions_not_met")}
-                payload.update(details)
-                return jsonify(payload), 403
-        # else: player has a card, we bypass normal conditions
-
-
-        # 5) Si tout est OK -> créer la tuile
-        t = Tile(
-            player_id=p.id,
-            resource=resource,
-            locked=False,
-            cooldown_until=None,
-        )
-        s.add(t)
-        s.commit()
-        s.refresh(t)
+    s = db_session()
+    # 1) Résoudre le player
+    if player_id is not None:
+        p = s.get(Player, int(player_id))
+        if not p:
+            return jsonify({"error": "player_not_found"}), 404
+    else:
+        me = get_current_player(s)
+        if not me:
+            return jsonify({"error": "player_required"}), 400
+        p = me
+
+    # 2) Valider chaque ressource (defs en cache) avant d'écrire quoi que ce soit
+    for resource in resources:
+        denied = _unlock_denied(s, p, resource)
+        if denied:
+            payload, status = denied
+            if batch:
+                payload["resource"] = resource
+            return jsonify(payload), status
+
+    # 3) Si tout est OK -> créer les tuiles (un INSERT ... RETURNING id)
+    tile_ids = s.scalars(
+        insert(Tile).returning(Tile.id, sort_by_parameter_order=True),
+        [
+            {"player_id": p.id, "resource": r, "locked": False, "cooldown_until": None}
+            for r in resources
+        ],
+    ).all()
+    s.commit()
+
+    if batch:
+        return jsonify({"ids": list(tile_ids)}), 200
+    return jsonify({"id": tile_ids[0]}), 200
 
-        return jsonify({"id": t.id}), 200        
-    
     # -----------------------------------------------------------------
     # Tiles
     # -----------------------------------------------------------------
 @bp.get("/player/<int:player_id>/tiles")
 def list_tiles(player_id: int):
     """Return all tiles for a player + metadata de ressource."""
-    with SessionLocal() as s:
-        # Fast check player exists
-        if not s.get(Player, player_id):
+    s = db_session()
+
+    # Tiles en Core rows (pas d'objets Tile) ; les métadonnées de ressource
+    # viennent du cache in-process, calculées une fois par ressource distincte
+    rows = s.execute(_Q_PLAYER_TILES, {"player_id": player_id}).mappings().all()
+
+    # Aucune tile : PK probe (sans hydrater Player) pour distinguer le 404
+    if not rows:
+        exists = s.execute(
+            select(literal(1)).select_from(Player).where(Player.id == player_id)
+        ).first()
+        if exists is None:
             return jsonify({"error": "player_not_found"}), 404
-
-        # jointure Tile + ResourceDef
-        rows = (
-            s.query(Tile, ResourceDef)
-            .outerjoin(ResourceDef, Tile.resource == ResourceDef.key)
-            .filter(Tile.player_id == player_id)
-            .all()
-        )
-
-        data = []
-        for t, rd in rows:
-            data.append({
-                "id": t.id,
-                "playerId": t.player_id,
-                "resource": t.resource,
-                "locked": t.locked,
-                "cooldown_until": t.cooldown_until.isoformat() if t.cooldown_until else None,
-
+        return jsonify([])
+
+    meta_by_res: dict[str, dict] = {}
+    data = []
+    for row in rows:
+        meta = meta_by_res.get(row["resource"])
+        if meta is None:
+            rd = get_resource_def(row["resource"], enabled_only=False)
+            meta = meta_by_res[row["resource"]] = {
                 # nouveaux champs pour le front /play :
                 "icon": rd.icon if rd else None,
                 "description": rd.description if rd else None,
                 # on expose un champ unlock_text que ton front consomme
-                "unlock_text": (
-                    rd.unlock_description
-                    if (rd and rd.unlock_description)
-                    else None
-                ),
-            })
-
-        return jsonify(data)    
\ No newline at end of file
+                "unlock_text": (rd.unlock_description or None) if rd else None,
+            }
+        data.append({**row, **meta})
+
+    return jsonify(data)    
\ No newline at end of file
@@ -1,10 +1,16 @@
 # app/routes/api_players.py
+import orjson
 from flask import Blueprint, jsonify, request
-from app.db import SessionLocal
-from app.models import Player, ResourceStock, ResourceDef
-from app.progression import next_threshold
+from sqlalchemy import func, literal, select, update
+
+from app.db import db_session
+from app.models import Player, ResourceStock
 from app.economy import list_prices
-from app.auth import get_current_player 
+from app.auth import current_player_id
+from app.resource_defs import ResourceDefSnapshot, get_resource_def
+from app.services.players import player_payload
+from app.routes.payloads import PayloadError, SellBody
+from app.http_cache import cached_body, content_etag
 
 bp = Blueprint("shop", __name__) 
 
@@ -16,13 +22,53 @@ def _round_qty(q, digits: int = 2) -> float:
 # -----------------------------------------------------------------
 # Prices & selling
 # -----------------------------------------------------------------
+# PRICES est statique (economy.py) : body JSON + ETag calculés une fois à l'import
+_PRICES_BODY = orjson.dumps({"prices": list_prices()})
+_PRICES_ETAG = content_etag(_PRICES_BODY)
+
+
 @bp.get("/prices")
 def get_prices():
-    return jsonify({"prices": list_prices()})
+    return cached_body(_PRICES_ETAG, _PRICES_BODY)
 
 # -----------------------------------------------------------------
 # Vendre une ressource contre des coins
 # -----------------------------------------------------------------
+def _body_player_id(raw) -> int | None:
+    """playerId du body (tests / DEV UI), parsé seulement quand on en a besoin."""
+    if raw is None:
+        return None
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        raise PayloadError("invalid_payload", "invalid_playerId")
+
+
+def _take_stock(s, pid: int, resource: str, qty: int) -> float | None:
+    """
+    Décrément conditionnel : refusé (None) si le stock est absent / insuffisant.
+    Pas de SELECT préalable, et deux ventes concurrentes ne peuvent pas
+    descendre le stock sous 0.
+    """
+    stocks = ResourceStock.__table__
+    return s.execute(
+        update(stocks)
+        .where(
+            stocks.c.player_id == pid,
+            stocks.c.resource == resource,
+            stocks.c.qty >= qty,
+        )
+        .values(qty=stocks.c.qty - qty)
+        .returning(stocks.c.qty)
+    ).scalar()
+
+
+def _player_exists(s, pid: int) -> bool:
+    return s.execute(
+        select(literal(1)).select_from(Player).where(Player.id == pid)
+    ).first() is not None
+
+
 @bp.post("/sell")
 def sell():
     """
@@ -35,86 +81,80 @@ def sell():
       "playerId": 1   # optionnel : pour les tests / DEV UI
     }
     """
-    data = request.get_json(silent=True) or {}
+    body = SellBody.from_json(request.get_json(silent=True))
+    resource, qty, player_id = body.resource, body.qty, body.player_id
 
-    resource = (data.get("resource") or "").strip()
-    qty = data.get("qty")
-    player_id = data.get("playerId")
+    # 1) On essaie d'abord via le cookie (GAME_UI)
+    cookie_pid = current_player_id()
+    pid = cookie_pid
 
-    # --- Validation basique -------------------------------------------------
-    if not resource:
-        return jsonify({"error": "invalid_payload", "detail": "missing_resource"}), 400
+    # 2) Sinon, on accepte playerId (tests + Debug UI)
+    if pid is None:
+        pid = _body_player_id(player_id)
 
-    try:
-        qty = int(qty)
-    except (TypeError, ValueError):
-        return jsonify({"error": "invalid_payload", "detail": "invalid_qty"}), 400
-
-    if qty <= 0:
-        return jsonify({"error": "invalid_payload", "detail": "qty_must_be_positive"}), 400
-
-    with SessionLocal() as s:
-        # 1) On essaie d'abord via le cookie (GAME_UI)
-        p: Player | None = get_current_player(s)
-
-        # 2) Sinon, on accepte playerId (tests + Debug UI)
-        if not p and player_id is not None:
-            try:
-                pid_int = int(player_id)
-            except (TypeError, ValueError):
-                return jsonify({"error": "invalid_payload", "detail": "invalid_playerId"}), 400
-            p = s.get(Player, pid_int)
-
-        if not p:
-            return jsonify({"error": "not_authenticated"}), 401
-
-        # Stock du joueur
-        rs: ResourceStock | None = (
-            s.query(ResourceStock)
-            .filter_by(player_id=p.id, resource=resource)
-            .first()
-        )
-        if not rs or rs.qty < qty:
+    if pid is None:
+        return jsonify({"error": "not_authenticated"}), 401
+
+    s = db_session()
+
+    new_qty = _take_stock(s, pid, resource, qty)
+
+    if new_qty is None:
+        exists = _player_exists(s, pid)
+        if not exists and pid == cookie_pid and player_id is not None:
+            # Cookie périmé (joueur supprimé / DB reset) : comme avant, on
+            # retombe sur playerId
+            pid = _body_player_id(player_id)
+            new_qty = _take_stock(s, pid, resource, qty)
+            exists = new_qty is not None or _player_exists(s, pid)
+
+        if new_qty is None:
+            # Joueur inconnu -> 401, sinon stock absent / insuffisant -> 400
+            if not exists:
+                return jsonify({"error": "not_authenticated"}), 401
             return jsonify({"error": "not_enough_stock"}), 400
 
-        # Prix unitaire : ResourceDef.base_sell_price (fallback = 1)
-        rd: ResourceDef | None = (
-            s.query(ResourceDef)
-            .filter_by(key=resource)
-            .first()
+    # Prix unitaire : ResourceDef.base_sell_price (fallback = 1)
+    rd: ResourceDefSnapshot | None = get_resource_def(resource, enabled_only=False)
+    unit_price: int = rd.base_sell_price if rd and rd.base_sell_price is not None else 1
+
+    # Crédit des coins + colonnes "player" de la réponse en un seul statement
+    gain = unit_price * qty
+    players = Player.__table__
+    player_row = s.execute(
+        update(players)
+        .where(players.c.id == pid)
+        .values(coins=func.coalesce(players.c.coins, 0) + gain)
+        .returning(
+            players.c.id,
+            players.c.name,
+            players.c.level,
+            players.c.coins,
+            players.c.diams,
+            players.c.xp,
         )
-        unit_price: int = rd.base_sell_price if rd and rd.base_sell_price is not None else 1
-
-        # Calcul du gain + mise à jour
-        rs.qty -= qty
-        gain = unit_price * qty
-        p.coins = (p.coins or 0) + gain
-
-        s.commit()
-        s.refresh(rs)
-        s.refresh(p)
-
-        return jsonify(
-            {
-                "ok": True,
-                "sold": {                      # 👈 structure attendue par les tests
-                    "resource": resource,
-                    "qty": qty,
-                    "gain": gain,
-                    "unit_price": unit_price,
-                },
-                "stock": {
-                    "resource": rs.resource,
-                    "qty": _round_qty(rs.qty),
-                },
-                "player": {
-                    "id": p.id,
-                    "name": p.name,
-                    "level": p.level,
-                    "xp": p.xp,
-                    "coins": p.coins,
-                    "diams": p.diams,
-                    "next_xp": next_threshold(p.level),
-                },
-            }
-        ), 200
\ No newline at end of file
+    ).first()
+
+    if player_row is None:
+        # Stock orphelin (pas de ligne players) : on annule le décrément
+        s.rollback()
+        return jsonify({"error": "not_authenticated"}), 401
+
+    s.commit()
+
+    return jsonify(
+        {
+            "ok": True,
+            "sold": {                      # 👈 structure attendue par les tests
+                "resource": resource,
+                "qty": qty,
+                "gain": gain,
+                "unit_price": unit_price,
+            },
+            "stock": {
+                "resource": resource,
+                "qty": _round_qty(new_qty),
+            },
+            "player": player_payload(player_row),
+        }
+    ), 200
@@ -0,0 +1,100 @@
+# =============================================================================
+# File: app/routes/payloads.py
+# Purpose: Parse + validate JSON bodies of the hot POST endpoints in one pass.
+# Notes:
+# - Each body class normalizes its fields once (strip / int coercion) and
+#   raises PayloadError on invalid input; register_routes() turns that into
+#   the usual {"error": ..., "detail": ...} 400 response.
+# - Error codes are the ones the handlers returned before (tests / front).
+# =============================================================================
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from flask import jsonify
+
+
+class PayloadError(Exception):
+    """Invalid request body -> JSON error response (400 by default)."""
+
+    def __init__(self, error: str, detail: str | None = None, status: int = 400):
+        super().__init__(error)
+        self.error = error
+        self.detail = detail
+        self.status = status
+
+    def to_response(self):
+        payload = {"error": self.error}
+        if self.detail is not None:
+            payload["detail"] = self.detail
+        return jsonify(payload), self.status
+
+
+def _as_dict(data: Any) -> dict:
+    return data if isinstance(data, dict) else {}
+
+
+def _as_str(value: Any) -> str:
+    return value.strip() if isinstance(value, str) else ""
+
+
+@dataclass(frozen=True, slots=True)
+class SellBody:
+    """POST /api/sell  {"resource": "branch", "qty": 2, "playerId": 1?}"""
+
+    resource: str
+    qty: int
+    # Raw value: only parsed when there is no cookie player (tests / DEV UI)
+    player_id: Any = None
+
+    @classmethod
+    def from_json(cls, data: Any) -> "SellBody":
+        data = _as_dict(data)
+
+        resource = _as_str(data.get("resource"))
+        if not resource:
+            raise PayloadError("invalid_payload", "missing_resource")
+
+        try:
+            qty = int(data.get("qty"))
+        except (TypeError, ValueError):
+            raise PayloadError("invalid_payload", "invalid_qty")
+
+        if qty <= 0:
+            raise PayloadError("invalid_payload", "qty_must_be_positive")
+
+        return cls(resource=resource, qty=qty, player_id=data.get("playerId"))
+
+
+@dataclass(frozen=True, slots=True)
+class CollectBody:
+    """
+    POST /api/collect
+    - land mode: {"land": "beach", "slot": 0}
+    - tile mode: {"tileId": 3}
+    """
+
+    land: str = ""
+    slot: int | None = None
+    tile_id: Any = None
+
+    @classmethod
+    def from_json(cls, data: Any) -> "CollectBody":
+        data = _as_dict(data)
+
+        land = _as_str(data.get("land"))
+        if land:
+            slot = data.get("slot")
+            if slot is None:
+                raise PayloadError("slot_required")
+            try:
+                slot = int(slot)
+            except (TypeError, ValueError):
+                raise PayloadError("slot_invalid")
+            return cls(land=land, slot=slot)
+
+        tile_id = data.get("tileId")
+        if not tile_id:
+            raise PayloadError("tileId_required")
+        return cls(tile_id=tile_id)
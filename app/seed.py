@@ -4,14 +4,25 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging
+import os
+import threading
 from pathlib import Path
 from typing import Any, Dict, List
 
 import yaml
+from sqlalchemy import or_, select
+
+try:  # libyaml-backed loader (much faster), pure-Python fallback
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader as _YamlLoader
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from .db import SessionLocal
-from .models import ResourceDef
+from .models import ResourceDef, SchemaMeta
+from .resource_defs import invalidate_resource_defs
 
 log = logging.getLogger(__name__)
 
@@ -75,6 +86,12 @@ def _default_resources() -> List[Dict[str, Any]]:
   ]
 
 
+# Dernière config parsée, indexée par (path, mtime_ns, size) du YAML.
+# L'admin réécrit resources.yml à chaud : tout changement du fichier
+# change la signature et force un nouveau parse.
+_CONFIG_CACHE: Dict[tuple, List[Dict[str, Any]]] = {}
+
+
 def load_resources_config(path: Path | None = None) -> List[Dict[str, Any]]:
     """Charge la config YAML des ressources.
 
@@ -83,12 +100,20 @@ def load_resources_config(path: Path | None = None) -> List[Dict[str, Any]]:
     """
     path = path or CONFIG_PATH
 
-    if not path.exists():
+    try:
+        st = path.stat()
+    except OSError:
         log.warning("resources.yaml introuvable (%s), utilisation des defaults.", path)
         return _default_resources()
 
+    # Fichier inchangé depuis le dernier parse -> pas de relecture / re-parse
+    sig = (str(path), st.st_mtime_ns, st.st_size)
+    cached = _CONFIG_CACHE.get(sig)
+    if cached is not None:
+        return [dict(d) for d in cached]
+
     try:
-        raw = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        raw = yaml.load(path.read_text(encoding="utf-8"), Loader=_YamlLoader) or {}
     except Exception as e:
         log.error("Erreur lors du chargement de %s: %s", path, e)
         return _default_resources()
@@ -132,57 +157,155 @@ def load_resources_config(path: Path | None = None) -> List[Dict[str, Any]]:
         log.warning("resources.yaml ne contient aucune ressource valide, utilisation des defaults.")
         return _default_resources()
 
-    return cleaned
+    _CONFIG_CACHE.clear()
+    _CONFIG_CACHE[sig] = cleaned
+    return [dict(d) for d in cleaned]
+
+
+# Colonnes synchronisées depuis le YAML (tout sauf id / key)
+_SYNC_COLUMNS = (
+    "label",
+    "base_cooldown",
+    "base_sell_price",
+    "unlock_min_level",
+    "enabled",
+    "icon",
+    "description",
+    "unlock_description",
+    "unlock_rules",
+)
 
 
-def _upsert_resources(config_items: List[Dict[str, Any]]) -> int:
-    with SessionLocal() as s:
-        existing = s.query(ResourceDef).all()
-        by_key = {r.key: r for r in existing}
-        changed = 0
-
-        for d in config_items:
-            key = d["key"]
-            row = by_key.get(key)
-
-            if row is None:
-                row = ResourceDef(**d)
-                s.add(row)
-                changed += 1
-            else:
-                row.label = d["label"]
-                row.base_cooldown = d["base_cooldown"]
-                row.base_sell_price = d["base_sell_price"]
-                row.unlock_min_level = d["unlock_min_level"]
-                row.enabled = d["enabled"]
-
-                # New fields
-                row.icon = d.get("icon", row.icon)
-                row.description = d.get("description", row.description)
-                row.unlock_description = d.get("unlock_description", row.unlock_description)
-                row.unlock_rules = d.get("unlock_rules")
-
-                changed += 1
+# Marqueurs schema_meta : sha256 du resources.yml déjà upserté, et empreinte
+# de resource_defs juste après cet upsert (détecte une table vidée / éditée
+# à la main alors que le YAML n'a pas bougé).
+_SEED_HASH_KEY = "resources_yml_sha256"
+_SEED_TABLE_KEY = "resource_defs_sha256"
+
+
+def _config_digest(path: Path | None = None) -> str | None:
+    """sha256 du YAML brut (None si absent : on seed alors les defaults)."""
+    try:
+        return hashlib.sha256((path or CONFIG_PATH).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _table_digest(s) -> str:
+    """sha256 des colonnes synchronisées de resource_defs (table de quelques lignes)."""
+    table = ResourceDef.__table__
+    rows = s.execute(
+        select(table.c.key, *(table.c[col] for col in _SYNC_COLUMNS))
+        .order_by(table.c.key)
+    ).all()
+    return hashlib.sha256(repr([tuple(r) for r in rows]).encode("utf-8")).hexdigest()
+
+
+def _set_marker(s, key: str, value: str) -> None:
+    marker = sqlite_insert(SchemaMeta).values(key=key, value=value)
+    s.execute(marker.on_conflict_do_update(
+        index_elements=["key"], set_={"value": marker.excluded.value},
+    ))
 
+
+def _upsert_resources(
+    config_items: List[Dict[str, Any]],
+    digest: str | None = None,
+) -> int:
+    """Upsert toutes les ressources en un seul INSERT ... ON CONFLICT(key).
+
+    Si `digest` est fourni, les marqueurs schema_meta (YAML + empreinte de
+    la table) sont mis à jour dans la même transaction. Retourne le nombre
+    de lignes insérées ou réellement modifiées.
+    """
+    if not config_items:
+        return 0
+
+    rows = [
+        {"key": d["key"], **{col: d.get(col) for col in _SYNC_COLUMNS}}
+        for d in config_items
+    ]
+
+    table = ResourceDef.__table__
+    stmt = sqlite_insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["key"],
+        set_={col: stmt.excluded[col] for col in _SYNC_COLUMNS},
+        # Ligne identique au YAML -> pas d'UPDATE (ni réécriture de page)
+        where=or_(*(
+            table.c[col].is_distinct_from(stmt.excluded[col])
+            for col in _SYNC_COLUMNS
+        )),
+    )
+
+    with SessionLocal() as s:
+        changed = s.execute(stmt).rowcount
+        if digest is not None:
+            _set_marker(s, _SEED_HASH_KEY, digest)
+            _set_marker(s, _SEED_TABLE_KEY, _table_digest(s))
         s.commit()
-        return changed
+
+    # Les defs en cache (collect / sell / unlock) doivent refléter le reseed
+    if changed:
+        invalidate_resource_defs()
+    return changed
+
+
+def _seed_is_current(digest: str) -> bool:
+    """YAML identique au dernier seed ET resource_defs intacte depuis."""
+    with SessionLocal() as s:
+        markers = dict(s.execute(
+            select(SchemaMeta.key, SchemaMeta.value)
+            .where(SchemaMeta.key.in_((_SEED_HASH_KEY, _SEED_TABLE_KEY)))
+        ).all())
+        if markers.get(_SEED_HASH_KEY) != digest:
+            return False
+        return markers.get(_SEED_TABLE_KEY) == _table_digest(s)
+
+
+# One-shot guard: PID of the process that already seeded (None = not yet).
+# Keyed on the PID so each forked worker seeds once, but repeated
+# create_app() calls in the same process (tests, reloader) skip the upsert.
+_SEEDED_PID: int | None = None
+_SEED_LOCK = threading.Lock()
 
 
 def ensure_resources_seeded() -> None:
   """Assure que la table ResourceDef est alignée avec le YAML.
 
-  Appelée au démarrage de l'app (create_app).
+  Appelée au démarrage de l'app (create_app). Une seule fois par process.
   """
-  cfg = load_resources_config()
-  n = _upsert_resources(cfg)
+  global _SEEDED_PID
+
+  if _SEEDED_PID == os.getpid():
+      return
+
+  with _SEED_LOCK:
+      if _SEEDED_PID == os.getpid():
+          return
+      # YAML et table inchangés depuis le dernier seed -> deux SELECT, pas d'upsert
+      digest = _config_digest()
+      if digest is not None and _seed_is_current(digest):
+          _SEEDED_PID = os.getpid()
+          log.info("ensure_resources_seeded: resources.yml et resource_defs inchangés, skip.")
+          return
+      cfg = load_resources_config()
+      n = _upsert_resources(cfg, digest)
+      _SEEDED_PID = os.getpid()
   log.info("ensure_resources_seeded: %s ressources upsertées.", n)
 
 
-def reseed_resources() -> int:
+def reseed_resources() -> tuple[int, int]:
   """Endpoint 'dev' pour reseeder.
 
-  Pour l'instant, on fait la même chose que ensure_resources_seeded
-  et on retourne le nombre de lignes touchées.
+  Même upsert que ensure_resources_seeded (sans le skip sur le marqueur).
+  Retourne (ressources synchronisées depuis le YAML, lignes réellement
+  insérées / modifiées) : les lignes déjà identiques au YAML ne comptent
+  que dans la première valeur.
   """
+  global _SEEDED_PID
+
   cfg = load_resources_config()
-  return _upsert_resources(cfg)
+  changed = _upsert_resources(cfg, _config_digest())
+  _SEEDED_PID = os.getpid()
+  return len(cfg), changed
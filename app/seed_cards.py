@@ -7,12 +7,35 @@ from __future__ import annotations
 import yaml
 from pathlib import Path
 
+from sqlalchemy import or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
 from app.db import SessionLocal
 from app.models import CardDef
 
 
 CARDS_FILE = Path("app/data/cards.yml")
 
+# Colonnes alimentées depuis cards.yml (tout sauf id)
+_CARD_COLUMNS = (
+    "key",
+    "label",
+    "description",
+    "icon",
+    "type",
+    "target_resource",
+    "target_building",
+    "max_owned",
+    "enabled",
+    "unlock_rules",
+    "categorie",
+    "rarity",
+    "gameplay",
+    "prices",
+    "shop",
+    "buy_rules",
+)
+
 
 def seed_cards_from_yaml() -> None:
     """Load cards.yml (new format) and sync card_defs table (dev mode)."""
@@ -28,41 +51,49 @@ def seed_cards_from_yaml() -> None:
         print("⚠ cards.yml contains no cards")
         return
 
-    with SessionLocal() as s:
-        for cfg in cards:
-            key = cfg["key"]
-
-            # Delete existing row (dev reset)
-            existing = s.query(CardDef).filter_by(key=key).first()
-            if existing:
-                s.delete(existing)
-                s.commit()
-
-            cd = CardDef(
-                key=key,
-                label=cfg["label"],
-                description=cfg.get("description"),
-                icon=cfg.get("icon"),
-
-                type=cfg.get("type", "").strip() or "generic",
+    # Une ligne par key (si doublon dans le YAML : la dernière gagne)
+    rows_by_key = {}
+    for cfg in cards:
+        key = cfg["key"]
+        rows_by_key[key] = {
+            "key": key,
+            "label": cfg["label"],
+            "description": cfg.get("description"),
+            "icon": cfg.get("icon"),
+
+            "type": cfg.get("type", "").strip() or "generic",
+
+            "target_resource": cfg.get("target_resource"),
+            "target_building": cfg.get("target_building"),
+
+            "max_owned": cfg.get("max_owned"),
+            "enabled": cfg.get("enabled", True),
+            "unlock_rules": cfg.get("unlock_rules"),
+
+            "categorie": cfg.get("categorie"),
+            "rarity": cfg.get("rarity"),
+
+            "gameplay": cfg.get("gameplay"),
+            "prices": cfg.get("prices"),
+            "shop": cfg.get("shop"),
+            "buy_rules": cfg.get("buy_rules"),
+        }
+
+    # Un seul INSERT ... ON CONFLICT(key) DO UPDATE (au lieu de DELETE + INSERT
+    # + COMMIT par carte) ; les lignes déjà identiques au YAML ne sont pas réécrites.
+    table = CardDef.__table__
+    sync_cols = [c for c in _CARD_COLUMNS if c != "key"]
+    stmt = sqlite_insert(table).values(list(rows_by_key.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["key"],
+        set_={col: stmt.excluded[col] for col in sync_cols},
+        where=or_(*(
+            table.c[col].is_distinct_from(stmt.excluded[col]) for col in sync_cols
+        )),
+    )
 
-                target_resource=cfg.get("target_resource"),
-                target_building=cfg.get("target_building"),
-
-                max_owned=cfg.get("max_owned"),
-                enabled=cfg.get("enabled", True),
-                unlock_rules=cfg.get("unlock_rules"),
-
-                categorie=cfg.get("categorie"),
-                rarity=cfg.get("rarity"),
-
-                gameplay=cfg.get("gameplay"),
-                prices=cfg.get("prices"),
-                shop=cfg.get("shop"),
-                buy_rules=cfg.get("buy_rules"),
-            )
-
-            s.add(cd)
-            s.commit()
+    with SessionLocal() as s:
+        s.execute(stmt)
+        s.commit()
 
-        print(f"✓ Loaded {len(cards)} cards from cards.yml")
\ No newline at end of file
+    print(f"✓ Loaded {len(cards)} cards from cards.yml")
@@ -0,0 +1,25 @@
+# =============================================================================
+# File: app/services/players.py
+# Purpose: Single "player" JSON payload shared by every endpoint that returns
+#          the player block (players / collect / sell / daily / state).
+# =============================================================================
+from __future__ import annotations
+
+from app.progression import next_threshold
+
+
+def player_payload(p) -> dict:
+    """Réponse player standard (objet Player ou Row Core avec les mêmes colonnes)."""
+    level = p.level
+    xp = p.xp
+    return {
+        "id": p.id,
+        "name": p.name,
+        "level": level,
+        "coins": p.coins,
+        "diams": p.diams,
+        # float() : les valeurs lues via RETURNING sortent avant l'affinité
+        # REAL de SQLite (1 au lieu de 1.0)
+        "xp": float(xp) if xp is not None else None,
+        "next_xp": next_threshold(level),
+    }
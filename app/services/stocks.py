@@ -0,0 +1,64 @@
+# =============================================================================
+# File: app/services/stocks.py
+# Purpose: Shared ResourceStock lookups / increments for the hot endpoints
+#          (collect / sell / buy / level rewards).
+# Notes:
+# - The SELECT is built once at import with bind parameters, so every call
+#   reuses SQLAlchemy's compiled-statement cache entry instead of rebuilding
+#   a Query object (same SQL shape, only the parameters change).
+# - Increments go through INSERT ... ON CONFLICT(player_id, resource)
+#   (uix_player_resource): one atomic statement, no SELECT-then-INSERT race.
+# =============================================================================
+from __future__ import annotations
+
+from sqlalchemy import bindparam, func, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models import ResourceStock
+
+_Q_PLAYER_STOCK = (
+    select(ResourceStock)
+    .where(
+        ResourceStock.player_id == bindparam("player_id"),
+        ResourceStock.resource == bindparam("resource"),
+    )
+    .limit(1)
+)
+
+
+def get_player_stock(
+    session: Session,
+    player_id: int,
+    resource: str,
+) -> ResourceStock | None:
+    """Return the player's stock row for `resource` (None if never collected)."""
+    return session.scalars(
+        _Q_PLAYER_STOCK,
+        {"player_id": player_id, "resource": resource},
+    ).first()
+
+
+def add_player_stock(
+    session: Session,
+    player_id: int,
+    resource: str,
+    amount: float,
+) -> None:
+    """Add `amount` to the player's stock of `resource` (row created if missing)."""
+    # Pending ORM rows (e.g. level rewards) must hit the DB before the upsert
+    session.flush()
+
+    stocks = ResourceStock.__table__
+    stmt = sqlite_insert(stocks).values(
+        player_id=player_id,
+        resource=resource,
+        qty=round(amount, 2),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["player_id", "resource"],
+        set_={
+            "qty": func.round(func.coalesce(stocks.c.qty, 0.0) + literal(amount), 2)
+        },
+    )
+    session.execute(stmt)
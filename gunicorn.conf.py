@@ -0,0 +1,27 @@
+# =============================================================================
+# File: gunicorn.conf.py
+# Purpose: Production-ish serving (Linux) : gunicorn run:app
+# Notes:
+# - gthread workers : the app is sync Flask + SQLAlchemy, threads overlap the
+#   DB / network waits without any async rewrite.
+# - One SQLAlchemy pool per worker process (app.db) : pool_size + max_overflow
+#   must stay >= threads, otherwise threads queue on the pool. app.db sizes
+#   the pool from the same GUNICORN_THREADS env var (set it in the
+#   environment, not by editing `threads` below).
+# - SQLite = a single writer : WAL (see app.db) keeps readers concurrent, but
+#   lower WEB_CONCURRENCY if writes start hitting "database is locked".
+# - Dev / Windows : keep using `python run.py`.
+# =============================================================================
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "127.0.0.1:8000")
+
+workers = int(os.getenv("WEB_CONCURRENCY", 2 * multiprocessing.cpu_count() + 1))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 16))
+
+# Keep-alive for the GAME_UI polling (state / collect)
+keepalive = 5
+timeout = 30
+graceful_timeout = 30
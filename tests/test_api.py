@@ -47,6 +47,69 @@ def test_health(client):
     assert data["status"] == "ok"
 
 
+def test_resources_etag_304(client):
+    rv = client.get("/api/resources")
+    assert rv.status_code == 200
+    etag = rv.headers["ETag"]
+
+    rv = client.get("/api/resources", headers={"If-None-Match": etag})
+    assert rv.status_code == 304
+    assert rv.data == b""
+
+
+def test_dev_reseed_counts(client):
+    from app.seed import load_resources_config
+
+    n_defs = len(load_resources_config())
+
+    rv = client.post("/api/dev/reseed")
+    assert rv.status_code == 200
+    data = rv.get_json()
+    assert data["ok"] is True
+    # inserted = toutes les defs du YAML, même celles déjà à jour
+    assert data["inserted"] == n_defs
+
+    # Deuxième reseed : tout est déjà aligné, rien n'est modifié
+    rv = client.post("/api/dev/reseed")
+    data = rv.get_json()
+    assert data["inserted"] == n_defs
+    assert data["changed"] == 0
+
+
+def test_startup_seed_repairs_emptied_resource_defs(client):
+    from sqlalchemy import delete, func, select
+    from app import seed
+    from app.db import SessionLocal
+    from app.models import ResourceDef
+
+    with SessionLocal() as s:
+        s.execute(delete(ResourceDef))
+        s.commit()
+
+    # resources.yml n'a pas changé, mais la table a été vidée : on reseed
+    seed._SEEDED_PID = None
+    seed.ensure_resources_seeded()
+
+    with SessionLocal() as s:
+        n = s.execute(select(func.count()).select_from(ResourceDef)).scalar()
+    assert n == len(seed.load_resources_config())
+
+
+def test_levels_thresholds(client):
+    from app.progression import LEVELS
+
+    rv = client.get("/api/levels")
+    assert rv.status_code == 200
+    thresholds = rv.get_json()["thresholds"]
+    assert thresholds == [
+        {"level": lvl, "xp_required": cfg["xp_required"]}
+        for lvl, cfg in sorted(LEVELS.items())
+    ]
+
+    rv = client.get("/api/levels", headers={"If-None-Match": rv.headers["ETag"]})
+    assert rv.status_code == 304
+
+
 def test_create_player_and_unlock_collect(client):
     # Create player
     rv = client.post("/api/player", json={"name": "Lloyd"})
@@ -121,6 +184,45 @@ def test_sell_flow(client):
     assert data["player"]["coins"] >= data["sold"]["gain"]
 
 
+def test_sell_stale_cookie_falls_back_to_player_id(client):
+    rv = client.post("/api/player", json={"name": f"Stale-{uuid4().hex[:6]}"})
+    pid = rv.get_json()["id"]
+
+    from app.db import SessionLocal
+    from app.models import ResourceStock
+
+    with SessionLocal() as s:
+        s.add(ResourceStock(player_id=pid, resource="branch", qty=3))
+        s.commit()
+
+    # Cookie d'un joueur qui n'existe plus (DB reset) : playerId prend le relais
+    client.set_cookie("player_id", "999999999")
+    rv = client.post(
+        "/api/sell",
+        json={"resource": "branch", "qty": 2, "playerId": pid},
+    )
+    assert rv.status_code == 200
+    assert rv.get_json()["player"]["id"] == pid
+
+    # Sans playerId -> 401 comme avant
+    rv = client.post("/api/sell", json={"resource": "branch", "qty": 1})
+    assert rv.status_code == 401
+
+
+def test_invalid_payloads_return_400(client):
+    rv = client.post("/api/sell", json={"resource": "branch", "qty": "abc"})
+    assert rv.status_code == 400
+    assert rv.get_json() == {"error": "invalid_payload", "detail": "invalid_qty"}
+
+    rv = client.post("/api/collect", json={"land": "beach", "slot": [1]})
+    assert rv.status_code == 400
+    assert rv.get_json()["error"] == "slot_invalid"
+
+    rv = client.post("/api/collect", json={})
+    assert rv.status_code == 400
+    assert rv.get_json()["error"] == "tileId_required"
+
+
 def test_daily_chest_once_per_day(client):
     name = f"POL-{uuid4().hex[:6]}"
 
@@ -197,3 +299,28 @@ def test_unlock_requires_min_level(client):
     data = rv.get_json()
     assert data["error"] == "level_too_low"
     assert data["required"] == demanding["unlock_min_level"]
+
+
+def test_unlock_batch_is_all_or_nothing(client):
+    rv = client.post("/api/player", json={"name": f"Batcher-{uuid4().hex[:6]}"})
+    assert rv.status_code == 200
+    pid = rv.get_json()["id"]
+
+    rv = client.post(
+        "/api/tiles/unlock",
+        json={"playerId": pid, "resources": ["branch", "branch"]},
+    )
+    assert rv.status_code == 200
+    ids = rv.get_json()["ids"]
+    assert len(ids) == 2 and ids[0] < ids[1]
+
+    # Une ressource inconnue -> rien n'est créé
+    rv = client.post(
+        "/api/tiles/unlock",
+        json={"playerId": pid, "resources": ["branch", "nope"]},
+    )
+    assert rv.status_code == 400
+    assert rv.get_json()["resource"] == "nope"
+
+    rv = client.get(f"/api/player/{pid}/tiles")
+    assert sorted(t["id"] for t in rv.get_json()) == ids
@@ -0,0 +1,30 @@
+# tests/test_progression.py
+from app.progression import LEVELS, MAX_LEVEL, level_for_xp, next_threshold
+
+
+def _scan_level_for_xp(xp):
+    # Référence : l'ancien parcours linéaire des niveaux triés
+    lvl = 0
+    for level in sorted(LEVELS.keys()):
+        if xp >= LEVELS[level]["xp_required"]:
+            lvl = level
+        else:
+            break
+    return lvl
+
+
+def test_level_for_xp_matches_linear_scan():
+    thresholds = sorted({cfg["xp_required"] for cfg in LEVELS.values()})
+    samples = [-1, 0, 0.5, 10**12]
+    for thr in thresholds:
+        samples += [thr - 1, thr - 0.01, thr, thr + 0.01]
+    for xp in samples:
+        assert level_for_xp(xp) == _scan_level_for_xp(xp), xp
+
+
+def test_next_threshold_table():
+    for level in range(MAX_LEVEL):
+        expected = LEVELS[level + 1]["xp_required"] if level + 1 in LEVELS else 10**9
+        assert next_threshold(level) == expected
+    assert next_threshold(MAX_LEVEL) is None
+    assert next_threshold(MAX_LEVEL + 5) is None